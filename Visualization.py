@@ -4,10 +4,10 @@ from matplotlib.figure import Figure
 from matplotlib.sankey import Sankey
 from matplotlib.figure import Figure
 from matplotlib.sankey import Sankey
-from collections import Counter
-import seaborn as sns
+import numpy as np
 import matplotlib.patches as mpatches
-from scipy.signal import butter, filtfilt
+from shared_eeg import map_channels, interpolate_and_bandpass
+from time_cursor import range_delta
 from PyQt5.QtWidgets import QVBoxLayout, QMainWindow, QWidget, QLabel
 from PyQt5.QtCore import Qt
 
@@ -15,8 +15,10 @@ from PyQt5.QtCore import Qt
     Heat Eye Tracking Plot: Displays eye movement data in a scatter plot, colored based on different movement types.
     Sankey Diagram: Visualizes transitions between different eye movement types.
     3D Eye Tracking Plot: Represents eye movement points in a 3D space.
+        The three eye views can be restricted to a time window (set_time_window) that follows the main EEG slider.
     EEG Signal Visualization: Displays the temporal variations of EEG signals in a selected channel.
     Pupil and EEG Plot: Correlates EEG alpha wave activity with pupil diameter, issuing warnings if values exceed normal thresholds.
+    Eye Event EEG Plot: EEG averaged around saccade onsets and fixation starts (eye-fixation-related potentials).
 
 """
 
@@ -31,31 +33,67 @@ class HeatEyeTrackingPlotWidget(QWidget):
         self.canvas = FigureCanvas(self.figure)
         self.layout.addWidget(self.canvas)
 
-    def plot_heat_eye_tracking_data(self, df):
+        self.scatters = {}  # Eye movement type index -> scatter collection
+        self.window = None  # Eye sample window currently drawn
+        self.rendered_key = None  # View cache key of the data currently drawn
+
+    def compute_plot_data(self, df):
+        # Plain arrays of the int8 type column and the gaze points; no per-row category strings are created
+        return {"types": df["Eye movement type index"].to_numpy(),
+                "gaze_x": df["Gaze point X"].to_numpy(),
+                "gaze_y": df["Gaze point Y"].to_numpy()}
+
+    def render_plot_data(self, data, window=None):
         print("Displaying Eye Tracking Scatter Plot")
         self.ax.clear()  
         
-        category_mapping = {0: "Fixation", 1: "Saccade", 2: "Eye Not Found"}
-        df["Eye movement category"] = df["Eye movement type index"].map(category_mapping)
-
         custom_palette = {
-            "Fixation": "#2ca02c",      # Green
-            "Saccade": "#d62728",       # Red
-            "Eye Not Found": "#000000"  # Black
+            0: ("#2ca02c", "Fixation"),      # Green
+            1: ("#d62728", "Saccade"),       # Red
+            2: ("#000000", "Eye Not Found")  # Black
         }
-        
-        # Creating a scatter plot using Seaborn
-        sns.scatterplot(data=df, x="Gaze point X", y="Gaze point Y", hue="Eye movement category", 
-                        palette=custom_palette, ax=self.ax)
+
+        self.types, self.gaze_x, self.gaze_y = data["types"], data["gaze_x"], data["gaze_y"]
+
+        # One collection per type; moving the time window only replaces their offsets
+        self.scatters = {type_index: self.ax.scatter([], [], c=color, s=15, label=label)
+                         for type_index, (color, label) in custom_palette.items()}
+        self.ax.legend(title="Eye movement category")
+
+        # Fixed limits from the whole recording, so the axes do not jump while the window moves
+        if np.isfinite(self.gaze_x).any() and np.isfinite(self.gaze_y).any():
+            self.ax.set_xlim(*self.padded_limits(self.gaze_x))
+            self.ax.set_ylim(*self.padded_limits(self.gaze_y))
         
         # Axis labels and settings
         self.ax.set_xlabel("Gaze point X")
         self.ax.set_ylabel("Gaze point Y")
         self.ax.set_title("Eye movement types and focused points")
 
-        self.canvas.draw()
+        self.window = None
+        self.set_time_window(window or (0, len(self.types)))
         self.setVisible(True)
 
+    def padded_limits(self, values, margin=0.05):
+        """Data range widened by margin on both sides, so points on the edge are not drawn on the axes border."""
+        low, high = np.nanmin(values), np.nanmax(values)
+        padding = (high - low) * margin if high > low else 0.5
+        return low - padding, high + padding
+
+    def set_time_window(self, window):
+        """Shows only the eye samples in window = (start, stop)."""
+        if not self.scatters or window == self.window:
+            return
+        start, stop = window
+        types = self.types[start:stop]
+        points = np.column_stack((self.gaze_x[start:stop], self.gaze_y[start:stop]))
+
+        for type_index, collection in self.scatters.items():
+            collection.set_offsets(points[types == type_index])
+        self.window = window
+
+        self.canvas.draw_idle()
+
 
 
 class SankeyDiagramWidget(QWidget):
@@ -68,36 +106,67 @@ class SankeyDiagramWidget(QWidget):
         self.canvas = FigureCanvas(self.figure)
         self.layout.addWidget(self.canvas)
 
-    def show_sankey_diagram(self, df):
+        self.transition_codes = None
+        self.window = None  # Eye sample window currently drawn
+        self.rendered_key = None  # View cache key of the data currently drawn
+
+    def compute_plot_data(self, df):
+        types = df["Eye movement type index"].to_numpy().astype(np.int64)
+        n_types = int(types.max()) + 1 if len(types) else 1
+
+        # Every consecutive pair (i, i+1) is encoded as source * n_types + target
+        return {"transition_codes": types[:-1] * n_types + types[1:], "n_types": n_types, "n_samples": len(types)}
+
+    def render_plot_data(self, data, window=None):
         print("Displaying Sankey Diagram")
-        self.create_sankey_diagram(df)
-        self.setVisible(True)
+        self.transition_codes = data["transition_codes"]
+        self.n_types = data["n_types"]
+        self.window = None
+        self.pair_window = (0, 0)
+        self.counts = np.zeros(self.n_types ** 2, dtype=np.int64)
+
+        self.set_time_window(window or (0, data["n_samples"]))
+
+    def set_time_window(self, window):
+        """
+            Updates the transition counts for the eye samples in window = (start, stop).
+            Only the pairs leaving and entering the window are subtracted / added, the rest of the counts are kept.
+        """
+        if self.transition_codes is None or window == self.window:
+            return
+        start, stop = window
+        pair_window = (start, max(start, stop - 1))  # Pair i needs both sample i and sample i+1 in the window
+
+        leaving, entering = range_delta(self.pair_window, pair_window)
+        for pair_start, pair_stop in leaving:
+            self.counts -= np.bincount(self.transition_codes[pair_start:pair_stop], minlength=self.n_types ** 2)
+        for pair_start, pair_stop in entering:
+            self.counts += np.bincount(self.transition_codes[pair_start:pair_stop], minlength=self.n_types ** 2)
+        self.pair_window = pair_window
+        self.window = window
+
+        self.create_sankey_diagram()
     
-    def create_sankey_diagram(self, df):
+    def create_sankey_diagram(self):
         self.ax.clear()
         
-        # Creating transitions between eye movement types
-        transitions = [(df["Eye movement type index"].iloc[i], df["Eye movement type index"].iloc[i+1]) 
-                       for i in range(len(df)-1)]
-        counts = Counter(transitions)
-        
-        unique_indexes = sorted(set(df["Eye movement type index"]))
-        labels = {idx: f"Type {idx}" for idx in unique_indexes}  # Dynamic labels
+        labels = {idx: f"Type {idx}" for idx in range(self.n_types)}  # Dynamic labels
         
         flows = []
         labels_list = []
-        for (source, target), value in counts.items():
-            if source in labels and target in labels:
-                flows.append(value)
-                labels_list.append(f"{labels[source]} → {labels[target]}")
+        for code in np.flatnonzero(self.counts):
+            source, target = divmod(int(code), self.n_types)
+            flows.append(int(self.counts[code]))
+            labels_list.append(f"{labels[source]} → {labels[target]}")
 
         # Creating the Sankey diagram
-        sankey = Sankey(ax=self.ax, unit=None)
-        sankey.add(flows=flows, labels=labels_list, orientations=[0]*len(flows))
-        sankey.finish()
+        if flows:
+            sankey = Sankey(ax=self.ax, unit=None)
+            sankey.add(flows=flows, labels=labels_list, orientations=[0]*len(flows))
+            sankey.finish()
         
         self.ax.set_title("Transitions between eye movement types")
-        self.canvas.draw()
+        self.canvas.draw_idle()
 
 
 class EyeTrackingPlot3DWindow(QMainWindow):
@@ -116,11 +185,14 @@ class EyeTrackingPlot3DWindow(QMainWindow):
         central_widget.setLayout(self.layout)
         self.setCentralWidget(central_widget)
 
+        self.scatters = {}  # Eye movement type index -> 3D scatter collection
+
     def clear_figure(self):
         """Clears the previous figure"""
         self.figure.clear()
+        self.scatters = {}
 
-    def plot_eye_tracking_data_3d(self, eye_data):
+    def plot_eye_tracking_data_3d(self, eye_data, window=None):
         """Displays 3D eye movement points with appropriate colors and legend"""
         self.clear_figure()
         ax = self.figure.add_subplot(111, projection="3d")
@@ -133,27 +205,27 @@ class EyeTrackingPlot3DWindow(QMainWindow):
         }
 
         # 🔍 Print unique values for verification
-        unique_types = eye_data["Eye movement type index"].unique()
-        print("Unique eye movement types:", unique_types)
-
-        # Assign colors and labels
-        colors = eye_data["Eye movement type index"].map(lambda t: custom_palette.get(t, ("#808080", "Unknown"))[0])
-
-        # If a type is missing from the palette, assign gray
-        colors = colors.fillna("#808080")
-
-        # Verification: Print the color mapping
-        print("🎨 Color mapping:", colors.unique())
-
-        # Display points
-        ax.scatter(
-            eye_data["Gaze point 3D X"],
-            eye_data["Gaze point 3D Y"],
-            eye_data["Gaze point 3D Z"],
-            c=colors,
-            s=5,
-            alpha=0.5
-        )
+        self.types = eye_data["Eye movement type index"].to_numpy()
+        print("Unique eye movement types:", np.unique(self.types))
+
+        self.points = np.column_stack((
+            eye_data["Gaze point 3D X"].to_numpy(),
+            eye_data["Gaze point 3D Y"].to_numpy(),
+            eye_data["Gaze point 3D Z"].to_numpy()
+        ))
+
+        # One collection per type; types missing from the palette are gray
+        palette = dict(custom_palette)
+        if not np.isin(self.types, list(custom_palette)).all():
+            palette[None] = ("#808080", "Unknown")
+        for type_index, (color, _) in palette.items():
+            self.scatters[type_index] = ax.scatter([], [], [], c=color, s=5, alpha=0.5)
+
+        # Fixed limits from the whole recording, so the axes do not jump while the window moves
+        if np.isfinite(self.points).all(axis=1).any():
+            ax.set_xlim(np.nanmin(self.points[:, 0]), np.nanmax(self.points[:, 0]))
+            ax.set_ylim(np.nanmin(self.points[:, 1]), np.nanmax(self.points[:, 1]))
+            ax.set_zlim(np.nanmin(self.points[:, 2]), np.nanmax(self.points[:, 2]))
 
         # Set axes labels
         ax.set_title("Eye Movement Points (3D Space)")
@@ -162,11 +234,30 @@ class EyeTrackingPlot3DWindow(QMainWindow):
         ax.set_zlabel("Gaze point 3D Z")
 
         # 📌 **Add legend**
-        legend_patches = [mpatches.Patch(color=color, label=label) for _, (color, label) in custom_palette.items()]
+        legend_patches = [mpatches.Patch(color=color, label=label) for _, (color, label) in palette.items()]
         ax.legend(handles=legend_patches, loc="upper right")
 
+        self.set_time_window(window or (0, len(self.types)))
+
+    def set_time_window(self, window):
+        """Shows only the eye samples in window = (start, stop)."""
+        if not self.scatters:
+            return
+        start, stop = window
+        types = self.types[start:stop]
+        points = self.points[start:stop]
+
+        known = np.zeros(len(types), dtype=bool)
+        for type_index, collection in self.scatters.items():
+            if type_index is None:
+                mask = ~known
+            else:
+                mask = types == type_index
+                known |= mask
+            collection._offsets3d = (points[mask, 0], points[mask, 1], points[mask, 2])
+
         # Update the canvas
-        self.canvas.draw()
+        self.canvas.draw_idle()
 
 
 class EEGPupilAnalyzer(QWidget):
@@ -210,41 +301,62 @@ class EEGPupilAnalyzer(QWidget):
         self.alert_label.setAlignment(Qt.AlignCenter)
         self.layout.addWidget(self.alert_label)
 
+        # Channels x samples; smaller recordings filter in-process faster than the worker pool starts (~2 s)
+        self.min_parallel_samples = 50_000_000
+
+        self.alpha_band = (8, 12)
+        self.filter_order = 4
+        self.smoothing_window = 50
+        self.rendered_key = None  # View cache key of the data currently drawn
+
     def clear_figure(self):
         """Clears the plots before redrawing."""
         self.ax1.clear()
         self.ax2.clear()
+        self.rendered_key = None
+
+    def plot_parameters(self):
+        """Parameters the computed plot data depends on; part of the view cache key."""
+        return self.alpha_band, self.filter_order, self.smoothing_window
+
+    def interpolate_to(self, common_time, index, values):
+        """Linear interpolation of one signal onto common_time; NaN samples are skipped."""
+        valid = np.isfinite(values)
+        if not valid.any():
+            return np.full(len(common_time), np.nan, dtype=np.float32)
+        return np.interp(common_time, index[valid], values[valid]).astype(np.float32)
+
+    def moving_average(self, data, window=50):
+        """Trailing moving average; the first window-1 points average over the samples available so far."""
+        cumulative = np.cumsum(data, dtype=np.float64)
+        smooth = cumulative.copy()
+        smooth[window:] = cumulative[window:] - cumulative[:-window]
+        counts = np.minimum(np.arange(1, len(data) + 1), window)
+        return smooth / counts
+
+    def compute_plot_data(self, raw, df_pupil, pupil=None):
+        """
+            Pupil diameters and smoothed EEG alpha activity on a common time scale, ready to plot.
+            pupil: cleaned diameters from PupilCleaner ({'left': ..., 'right': ...}); the raw columns are used without it.
+        """
+        print("Computing Pupil Diameter and EEG Alpha Waves data")
+        pupil_index = np.arange(len(df_pupil), dtype=np.float64)
 
-    def bandpass_filter(self, fs, data, lowcut=8, highcut=12, order=4):
-        """Butterworth bandpass filter for highlighting EEG alpha waves."""
-        nyquist = 0.5 * fs
-        low = lowcut / nyquist
-        high = highcut / nyquist
-        b, a = butter(order, [low, high], btype='band')
-        return filtfilt(b, a, data, axis=0)
-
-    def show_pupil_eeg_plot(self, pd, np, raw, df_pupil):
-        """Displays pupil and EEG data on a common time scale."""
-        print("Displaying Pupil Diameter and EEG Alpha Waves Plot")
-        df_eeg = raw.to_data_frame()
-        print(df_eeg)
-        if "time" not in df_eeg.columns:
-            raise ValueError("The EEG data does not contain a 'time' column.")
-
-        df_eeg.set_index("time", inplace=True)
+        if len(pupil_index) == 0 or raw.n_times == 0:
+            raise ValueError("No common time interval found between pupil and EEG data.")
 
-        min_time = max(df_pupil.index.min(), df_eeg.index.min())
-        max_time = min(df_pupil.index.max(), df_eeg.index.max())
+        min_time = max(pupil_index[0], 0.0)
+        max_time = min(pupil_index[-1], (raw.n_times - 1) / raw.info['sfreq'])
         """
             We calculate the time window during which both the EEG and pupil data are available.
-                The max(df_pupil.index.min(), df_eeg.index.min()) ensures that we take the first common time point.
-                The min(df_pupil.index.max(), df_eeg.index.max()) determines the last common time point.
+                The max(first pupil index, first EEG time) ensures that we take the first common time point.
+                The min(last pupil index, last EEG time) determines the last common time point.
 
             In other words, we consider only the data that exists in both sources.
         
         """
 
-        if pd.isna(min_time) or pd.isna(max_time):
+        if min_time > max_time:
             raise ValueError("No common time interval found between pupil and EEG data.")
 
         common_time = np.linspace(min_time, max_time, num=len(df_pupil))
@@ -256,70 +368,85 @@ class EEGPupilAnalyzer(QWidget):
             They need to be brought onto a common time scale to make them comparable.
         """
 
-        df_pupil_interp = df_pupil.reindex(df_pupil.index.union(common_time)).interpolate(method="linear").loc[common_time]
-        df_eeg_interp = df_eeg.reindex(df_eeg.index.union(common_time)).interpolate(method="linear").loc[common_time]
+        if pupil is None:
+            pupil = {"left": df_pupil["Pupil diameter left"].to_numpy(), "right": df_pupil["Pupil diameter right"].to_numpy()}
+
+        pupil_left = self.interpolate_to(common_time, pupil_index, pupil["left"])
+        pupil_right = self.interpolate_to(common_time, pupil_index, pupil["right"])
         """
-            The new common time points are added to the original index.
-            
-                Interpolation is performed (interpolate(method="linear")) to obtain the corresponding values for these new time points.
-                The data is then filtered to the new common time scale using loc[common_time].
+            Each pupil signal is evaluated at the common time points with np.interp, straight from the arrays.
+            The EEG channels are resampled the same way inside alpha_activity, channel by channel.
 
-                    If the EEG and pupil data were recorded at different time points, interpolation is used to estimate the intermediate values.
-                    Linear interpolation assumes a smooth, even transition between two known points.
+                If the EEG and pupil data were recorded at different time points, interpolation is used to estimate the intermediate values.
+                Linear interpolation assumes a smooth, even transition between two known points.
         
         """
 
-        self.create_pupil_eeg_plot(df_pupil_interp, df_eeg_interp, raw.info['sfreq'])
-        self.setVisible(True)
+        eeg_alpha_mean = self.alpha_activity(raw, (min_time, max_time, len(common_time)),
+                                             *self.alpha_band, order=self.filter_order)
+
+        eeg_alpha_smooth = self.moving_average(eeg_alpha_mean, window=self.smoothing_window)
+        """
+            window=50 → The moving average is computed from 50 consecutive data points.
+            
+            Thus, at each time point, the new value is given by the average of the current value and the preceding 49 values.
+        """
 
-    def create_pupil_eeg_plot(self, df_pupil, df_eeg, freq):
+        return {"common_time": common_time, "pupil_left": pupil_left, "pupil_right": pupil_right,
+                "eeg_alpha_smooth": eeg_alpha_smooth}
+
+    def alpha_activity(self, raw, time_spec, lowcut=8, highcut=12, order=4):
+        """Channel-averaged alpha band signal of the EEG resampled onto np.linspace(*time_spec)."""
+        args = (raw.info['sfreq'], time_spec, lowcut, highcut, order)
+
+        if raw.shared is not None and len(raw.ch_names) > 1 and raw.data.size >= self.min_parallel_samples:
+            # Workers attach to the shared EEG block and filter their own channel slice in place
+            eeg_alpha_filtered = map_channels(interpolate_and_bandpass, raw.shared, time_spec[2], args=args)
+            try:
+                eeg_alpha_mean = eeg_alpha_filtered.array.mean(axis=0)
+            finally:
+                eeg_alpha_filtered.close()
+        else:
+            eeg_alpha_mean = interpolate_and_bandpass(raw.data, *args).mean(axis=0)
+        """
+            Apply a bandpass filter to every channel of the EEG data, allowing only frequencies between 8-12 Hz to pass through.
+            This filters out the alpha waves (8-12 Hz) from the EEG signals.
+
+            Then calculate the averaged alpha activity of all EEG channels over time (at each time point).
+            The axis=0 parameter averages over the channel rows, so the final value is the average of all channels.
+        
+        """
+        return eeg_alpha_mean * 1e6  # The EEG arrays are in volts; plotted in µV like raw.to_data_frame() did
+
+    def create_pupil_eeg_plot(self, common_time, pupil_left, pupil_right, eeg_alpha_smooth):
         """Displays pupil diameter and EEG Alpha waves with filtered data."""
+        print("Displaying Pupil Diameter and EEG Alpha Waves Plot")
         self.clear_figure()
         alert_messages = []
 
         # **Pupil warning**
-        if "Pupil diameter left" in df_pupil.columns and "Pupil diameter right" in df_pupil.columns:
-            self.ax1.plot(df_pupil.index, df_pupil["Pupil diameter left"], label="Left pupil", color="blue")
-            self.ax1.plot(df_pupil.index, df_pupil["Pupil diameter right"], label="Right pupil", color="red")
+        self.ax1.plot(common_time, pupil_left, label="Left pupil", color="blue")
+        self.ax1.plot(common_time, pupil_right, label="Right pupil", color="red")
 
-            # **Warning if pupil diameter is too small or large**
-            pupil_min, pupil_max = 2.0, 6.5  
-            if df_pupil["Pupil diameter left"].min() < pupil_min or df_pupil["Pupil diameter right"].min() < pupil_min:
-                self.ax1.axhline(y=pupil_min, color='red', linestyle='--', label="Too small pupil")
-                alert_messages.append("⚠️ Pupil too small!")
+        # **Warning if pupil diameter is too small or large**
+        pupil_min, pupil_max = 2.0, 6.5  
+        if np.nanmin(pupil_left) < pupil_min or np.nanmin(pupil_right) < pupil_min:
+            self.ax1.axhline(y=pupil_min, color='red', linestyle='--', label="Too small pupil")
+            alert_messages.append("⚠️ Pupil too small!")
 
-            if df_pupil["Pupil diameter left"].max() > pupil_max or df_pupil["Pupil diameter right"].max() > pupil_max:
-                self.ax1.axhline(y=pupil_max, color='orange', linestyle='--', label="Too large pupil")
-                alert_messages.append("⚠️ Pupil too dilated!")
+        if np.nanmax(pupil_left) > pupil_max or np.nanmax(pupil_right) > pupil_max:
+            self.ax1.axhline(y=pupil_max, color='orange', linestyle='--', label="Too large pupil")
+            alert_messages.append("⚠️ Pupil too dilated!")
 
         self.ax1.set_ylabel("Pupil Diameter (mm)", fontsize=12, labelpad=10)
         self.ax1.set_title("Changes in Pupil Diameter Over Time", fontsize=14, pad=15)
         self.ax1.legend()
         self.ax1.grid()
 
-        # **EEG Alpha Wave Filtering**
-        eeg_alpha_filtered = df_eeg.apply(lambda col: self.bandpass_filter(freq, col, lowcut=8, highcut=12))
-        """
-            Apply a bandpass filter to every column (each channel) of the EEG data (df_eeg), allowing only frequencies between 8-12 Hz to pass through.
-            This filters out the alpha waves (8-12 Hz) from the EEG signals.
-        """
-        eeg_alpha_mean = eeg_alpha_filtered.mean(axis=1)
-        """
-            Calculate the averaged alpha activity of all EEG channels over time (row-wise, meaning at each time point).
-            The axis=1 parameter means averaging row-wise, so the final value is the average of all channels.
-        
-        """
-        eeg_alpha_smooth = eeg_alpha_mean.rolling(window=50, min_periods=1).mean()
-        """
-            window=50 → The moving average is computed from 50 consecutive data points.
-            
-            Thus, at each time point, the new value is given by the average of the current value and the preceding 49 values.
-        """
-
-        self.ax2.plot(df_eeg.index, eeg_alpha_smooth, label="Filtered Alpha Activity", color="green")
+        self.ax2.plot(common_time, eeg_alpha_smooth, label="Filtered Alpha Activity", color="green")
 
         # **EEG Activity Warning**
-        eeg_threshold_low, eeg_threshold_high = eeg_alpha_smooth.quantile(0.05), eeg_alpha_smooth.quantile(0.95)
+        eeg_threshold_low, eeg_threshold_high = np.quantile(eeg_alpha_smooth, [0.05, 0.95])
         """
             0.05 quantile (5%) → Lower threshold: if the alpha activity is too low.
             0.95 quantile (95%) → Upper threshold: if the alpha activity is too high.
@@ -358,7 +485,7 @@ class EEGPupilAnalyzer(QWidget):
                 alert_messages.append("⚠️ EEG Alpha activity too high!")
 
         self.ax2.set_xlabel("Time Index", fontsize=12, labelpad=10)
-        self.ax2.set_ylabel("EEG Alpha Waves", fontsize=12, labelpad=10)
+        self.ax2.set_ylabel("EEG Alpha Waves (µV)", fontsize=12, labelpad=10)
         self.ax2.set_title("Changes in EEG Alpha Waves Over Time", fontsize=14, pad=15)
         self.ax2.legend()
         self.ax2.grid()
@@ -397,5 +524,52 @@ class EEGSignalVisualizationbWidget(QWidget):
         ax.set_title(f"EEG Signal Over Time - {channel_name}")
         ax.grid()
         
-        self.canvas.draw()  
-        
\ No newline at end of file
+        self.canvas.draw()
+
+
+class EyeEventEEGWidget(QWidget):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setVisible(False)
+
+        self.layout = QVBoxLayout(self)
+        self.figure = Figure(figsize=(12, 6))
+        self.canvas = FigureCanvas(self.figure)
+        self.layout.addWidget(self.canvas)
+
+        self.rendered_key = None  # View cache key of the data currently drawn
+
+    def clear_figure(self):
+        self.figure.clear()
+        self.rendered_key = None
+
+    def plot_event_averages(self, results):
+        """
+            One subplot per event type: every channel's average in gray, the mean over channels in color.
+            results maps the event name to the dict returned by EpochEngine.get_average.
+        """
+        print("Displaying Eye Event EEG Averages")
+        self.clear_figure()
+
+        for plot_idx, (event_name, result) in enumerate(results.items()):
+            ax = self.figure.add_subplot(len(results), 1, plot_idx + 1)
+            times, average = result["times"], result["average"]
+
+            if result["n_events"] == 0:
+                ax.set_title(f"EEG around {event_name.lower()} (no events)", fontsize=14, pad=15)
+                continue
+
+            ax.plot(times, average.T, color="gray", linewidth=0.5, alpha=0.5)
+            ax.plot(times, np.nanmean(average, axis=0), color="purple", linewidth=2, label="Mean of all channels")
+            ax.axvline(x=0, color="black", linestyle="--")
+
+            ax.set_title(f"EEG around {event_name.lower()} ({result['n_events']} events)", fontsize=14, pad=15)
+            ax.set_ylabel("EEG Signal (V)", fontsize=12, labelpad=10)
+            ax.legend()
+            ax.grid()
+
+        if self.figure.axes:
+            self.figure.axes[-1].set_xlabel("Time relative to event (s)", fontsize=12, labelpad=10)
+        self.figure.subplots_adjust(hspace=0.4)
+        self.canvas.draw()
+        self.setVisible(True)
@@ -1,15 +1,65 @@
 import os
 import mne
+import numpy as np
+from shared_eeg import SharedEEGArray
+from pupil_cleaning import PupilCleaner
 
 """
     Loads EEG data from .edf files using the MNE library.
     Reads eye-tracking data from .csv files with predefined column names.
     Processes CSV files related to tasks and performance data, then displays them in tables (e.g., task list, performance data).
     
+    Compact data mode (default):
+        EEG is held as one contiguous float32 channels x samples array instead of MNE's float64 buffer.
+        Eye-tracking columns are read as float32, the eye movement type index as int8.
+        A per-recording memory report shows how many bytes each loaded recording occupies.
+    
+    Shared-memory mode (default): the EEG array is allocated in a shared memory block so worker processes
+    can attach to it by name (see shared_eeg.py). Call EEGRecording.close() when the recording is no longer needed.
+    
 """
 
+
+class EEGRecording:
+    """Lightweight EEG container: a channels x samples array plus the metadata the widgets need."""
+
+    def __init__(self, data, ch_names, sfreq, shared=None):
+        self.data = data
+        self.ch_names = list(ch_names)
+        self.info = {'sfreq': sfreq}
+        self.n_times = data.shape[1]
+        self.shared = shared  # SharedEEGArray backing 'data', or None for a private array
+
+    def __len__(self):
+        return self.n_times
+
+    @property
+    def times(self):
+        return np.arange(self.n_times, dtype=np.float64) / self.info['sfreq']
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes if self.data is not None else 0
+
+    def close(self):
+        """Releases the sample array (and its shared memory block)."""
+        self.data = None
+        if self.shared is not None:
+            self.shared.close()
+            self.shared = None
+
+
 class DataManager:
-    def __init__(self):
+    def __init__(self, compact_data=True, shared_memory=True):
+        self.compact_data = compact_data
+        self.shared_memory = shared_memory
+        self.data_dir = r'C:\Users\T\Desktop\tomi_valai'
+        self.eeg_dir = os.path.join(self.data_dir, 'EEG')
+        self.eye_dir = os.path.join(self.data_dir, 'EYE')
+        self.eeg_dtype = np.float32 if compact_data else np.float64
+        self.eeg_read_chunk_seconds = 10  # EEG is copied into the target array in blocks of this length
+        self.pupil_cleaner = PupilCleaner()  # Shared by the views and the feature store, so cleaned pupils are cached once
+
         self.column_names_to_eye_df = [
             "Gaze point X", "Gaze point Y", "Gaze point 3D X", "Gaze point 3D Y", "Gaze point 3D Z",
             "Gaze direction left X", "Gaze direction left Y", "Gaze direction left Z",
@@ -18,9 +68,14 @@ class DataManager:
             "Pupil position right X", "Pupil position right Y", "Pupil position right Z",
             "Pupil diameter left", "Pupil diameter right", "Eye movement type index"
         ]
+        if compact_data:
+            self.eye_dtypes = {col: np.float32 for col in self.column_names_to_eye_df}
+            self.eye_dtypes["Eye movement type index"] = np.int8
+        else:
+            self.eye_dtypes = None
 
     def fill_choose_file_combobox_with_filenames(self, combo_box):
-        eeg_files = [f for f in os.listdir(r'C:\Users\T\Desktop\tomi_valai\EEG') if f.endswith('.edf')]
+        eeg_files = [f for f in os.listdir(self.eeg_dir) if f.endswith('.edf')]
         combo_box.addItem("")  # Empty value at the top of the list
         combo_box.addItems([f.replace('.edf', '') for f in eeg_files])
 
@@ -52,13 +107,7 @@ class DataManager:
         table_widget.resizeRowsToContents()  # Auto-adjust row height
 
     def insert_performance_data_into_table(self, pd, selected_file, QtWidgets, QTableWidgetItem, performance_table):
-        perf_df = self.load_performance_csv(pd)
-
-        perf_df["EEG File Name"] = perf_df["EEG File Name"].str.replace("'", "")
-        perf_df["EEG File Name"] = perf_df["EEG File Name"].str.removesuffix(".edf")
-
-        perf_df["Eye File Name"] = perf_df["Eye File Name"].str.replace("'", "")
-        perf_df["Eye File Name"] = perf_df["Eye File Name"].str.removesuffix(".csv")
+        perf_df = self.load_performance_data(pd)
         selected_file = selected_file.strip().lower()
 
         matched_row = perf_df[perf_df["EEG File Name"] == selected_file]
@@ -91,22 +140,99 @@ class DataManager:
         performance_table.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
         performance_table.horizontalHeader().setMaximumSectionSize(300)
 
+    def insert_dataframe_into_table(self, QTableWidgetItem, QtWidgets, table_widget, df):
+        table_widget.clear()
+        table_widget.setRowCount(df.shape[0])
+        table_widget.setColumnCount(df.shape[1])
+        table_widget.setHorizontalHeaderLabels([str(col) for col in df.columns])
+
+        for row in range(df.shape[0]):
+            for col in range(df.shape[1]):
+                value = df.iat[row, col]
+                text = f"{value:.4g}" if isinstance(value, float) else str(value)
+                table_widget.setItem(row, col, QTableWidgetItem(text))
+
+        table_widget.verticalHeader().setVisible(False)
+        table_widget.setAlternatingRowColors(True)
+        table_widget.setSortingEnabled(True)
+        table_widget.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+
+    def get_eeg_file_path(self, recording_name):
+        return os.path.join(self.eeg_dir, recording_name + '.edf')
+
+    def get_eye_file_path(self, recording_name):
+        return os.path.join(self.eye_dir, recording_name + '.csv')
+
+    def get_recording_names(self):
+        """Names of all recordings that have an EEG file, an eye-tracking file or both."""
+        eeg_names = {f.removesuffix('.edf') for f in os.listdir(self.eeg_dir) if f.endswith('.edf')}
+        eye_names = {f.removesuffix('.csv') for f in os.listdir(self.eye_dir) if f.endswith('.csv')}
+        return sorted(eeg_names | eye_names)
+
     def load_eeg_data(self, selected_filename):
-        eeg_file_path = os.path.join(r'C:\Users\T\Desktop\tomi_valai\EEG', selected_filename + '.edf')
-        raw = mne.io.read_raw_edf(eeg_file_path, preload=True)
+        eeg_file_path = self.get_eeg_file_path(selected_filename)
+        raw = mne.io.read_raw_edf(eeg_file_path, preload=False)
 
         print(f"EEG file loaded: {eeg_file_path}")
         print(raw.info)
 
-        return raw
+        shape = (len(raw.ch_names), raw.n_times)
+        shared = SharedEEGArray(shape, self.eeg_dtype) if self.shared_memory else None
+        try:
+            data = self.read_eeg_samples(raw, shared.array if shared is not None else np.empty(shape, dtype=self.eeg_dtype))
+        except Exception:
+            if shared is not None:
+                shared.close()
+            raise
+
+        return EEGRecording(data, raw.ch_names, raw.info['sfreq'], shared=shared)
+
+    def read_eeg_samples(self, raw, out):
+        """
+            Copies the EEG samples into 'out' block by block.
+            Only one float64 block of eeg_read_chunk_seconds exists at a time, so the full-length
+            float64 array that preload=True would create is never allocated.
+        """
+        chunk = max(1, int(self.eeg_read_chunk_seconds * raw.info['sfreq']))
+        for start in range(0, raw.n_times, chunk):
+            stop = min(start + chunk, raw.n_times)
+            out[:, start:stop] = raw.get_data(start=start, stop=stop)
+        return out
 
     def load_eye_data(self, selected_filename, pd):
-        eye_file_path = os.path.join(r'C:\Users\T\Desktop\tomi_valai\EYE', selected_filename + '.csv')
-        eye_data = pd.read_csv(eye_file_path, header=None, names=self.column_names_to_eye_df)
+        eye_file_path = self.get_eye_file_path(selected_filename)
+        eye_data = pd.read_csv(eye_file_path, header=None, names=self.column_names_to_eye_df, dtype=self.eye_dtypes)
 
         return eye_data
 
+    def memory_report(self, eeg, eye_data, caches=None):
+        """
+            Returns the in-memory size (bytes) of a loaded recording, split by source.
+            caches: optional {name: bytes} of the derived data caches, reported separately and added to the total.
+        """
+        eeg_bytes = eeg.nbytes if eeg is not None else 0
+        eye_bytes = int(eye_data.memory_usage(index=True, deep=True).sum()) if eye_data is not None else 0
+
+        report = {"EEG": eeg_bytes, "Eye": eye_bytes} | (caches or {})
+        report["Total"] = sum(report.values())
+        return report
+
+    def format_memory_report(self, report):
+        return "\n".join(f"{key}: {value / 1024 ** 2:.2f} MB" for key, value in report.items())
+
+    def load_performance_data(self, pd):
+        """Performance scores with the quotes and extensions stripped from the file name columns."""
+        perf_df = self.load_performance_csv(pd)
+
+        perf_df["EEG File Name"] = perf_df["EEG File Name"].str.replace("'", "")
+        perf_df["EEG File Name"] = perf_df["EEG File Name"].str.removesuffix(".edf")
+
+        perf_df["Eye File Name"] = perf_df["Eye File Name"].str.replace("'", "")
+        perf_df["Eye File Name"] = perf_df["Eye File Name"].str.removesuffix(".csv")
+
+        return perf_df
+
     def load_performance_csv(self, pd):
-        performance_df = pd.read_csv(r'C:\Users\T\Desktop\tomi_valai\PerformanceScores.csv')
+        performance_df = pd.read_csv(os.path.join(self.data_dir, 'PerformanceScores.csv'))
         print(performance_df)
         return performance_df
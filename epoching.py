@@ -0,0 +1,94 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from view_cache import data_nbytes
+
+"""
+    Event-locked EEG epoching around eye movement events (eye-fixation-related potentials).
+
+        Event onsets are the samples where the eye movement type index switches to the given type
+        (e.g. 1 = saccade onset, 0 = fixation start). They are mapped to EEG sample indices through
+        the recording's TimeCursor.
+
+        Epochs for all channels and events are taken at once from a strided sliding-window view of the
+        channels x samples array: no per-event slicing, a single gather into a
+        (channels, events, samples) float32 array.
+
+        Baseline correction and averaging are vectorized over channels and events.
+        Results are cached per recording and parameter set; clear() drops them when the recording changes.
+        Only the averages are cached unless keep_epochs is set: the full epoch arrays are events times larger.
+
+"""
+
+EVENT_TYPES = {"Saccade onset": 1, "Fixation start": 0}
+
+
+def event_onsets(types, event_type):
+    """Eye sample indices where the eye movement type switches to event_type."""
+    types = np.asarray(types)
+    return np.flatnonzero((types[1:] == event_type) & (types[:-1] != event_type)) + 1
+
+
+def extract_epochs(data, onsets, pre_samples, post_samples):
+    """
+        Epochs of shape (channels, events, pre_samples + post_samples) around the given EEG sample onsets.
+        Events whose window does not fit into the recording are dropped.
+    """
+    epoch_length = pre_samples + post_samples
+    starts = np.asarray(onsets, dtype=np.int64) - pre_samples
+    starts = starts[(starts >= 0) & (starts + epoch_length <= data.shape[1])]
+
+    if len(starts) == 0:
+        return np.empty((data.shape[0], 0, epoch_length), dtype=np.float32)
+
+    windows = sliding_window_view(data, epoch_length, axis=1)  # (channels, n_windows, epoch_length), no copy
+    return windows[:, starts].astype(np.float32, copy=False)
+
+
+class EpochEngine:
+    def __init__(self, tmin=-0.2, tmax=0.6, baseline=(-0.2, 0.0), keep_epochs=False):
+        self.tmin = tmin
+        self.tmax = tmax
+        self.baseline = baseline
+        self.keep_epochs = keep_epochs
+        self.cache = {}  # (recording, event type, tmin, tmax, baseline) -> result dict
+
+    @property
+    def nbytes(self):
+        return data_nbytes(self.cache)
+
+    def clear(self):
+        self.cache.clear()
+
+    def get_average(self, recording_name, raw, eye_types, time_cursor, event_type):
+        """
+            Baseline-corrected epochs and their average for one event type.
+            Returns a dict with 'average' (channels, samples), 'times' (seconds relative to the event), 'n_events'
+            and, if keep_epochs is set, 'epochs' (channels, events, samples).
+        """
+        key = (recording_name, event_type, self.tmin, self.tmax, self.baseline)
+        if key in self.cache:
+            return self.cache[key]
+
+        sfreq = raw.info['sfreq']
+        pre_samples = int(round(-self.tmin * sfreq))
+        post_samples = int(round(self.tmax * sfreq))
+        times = np.arange(-pre_samples, post_samples) / sfreq
+
+        onsets = time_cursor.eye_to_eeg_samples(event_onsets(eye_types, event_type))
+        epochs = extract_epochs(raw.data, onsets, pre_samples, post_samples)
+
+        # Baseline correction: subtract each epoch's mean over the baseline interval, all epochs at once
+        baseline_mask = (times >= self.baseline[0]) & (times <= self.baseline[1])
+        if baseline_mask.any() and epochs.shape[1]:
+            epochs -= epochs[:, :, baseline_mask].mean(axis=2, keepdims=True)
+
+        if epochs.shape[1]:
+            average = epochs.mean(axis=1)
+        else:
+            average = np.full((epochs.shape[0], epochs.shape[2]), np.nan, dtype=np.float32)
+
+        result = {"average": average, "times": times, "n_events": epochs.shape[1]}
+        if self.keep_epochs:
+            result["epochs"] = epochs
+        self.cache[key] = result
+        return result
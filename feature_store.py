@@ -0,0 +1,264 @@
+import os
+import numpy as np
+import pandas as pd
+from scipy.signal import welch
+
+"""
+    Cross-recording feature store.
+
+        Computes a fixed feature vector for every recording (EEG band power, cleaned pupil statistics
+        and the share of interpolated pupil samples, eye movement ratios, transition matrix and dwell times) and keeps all of them in one
+        columnar .npz file (one array per feature column).
+
+        On update only new or changed recordings are recomputed; a recording counts as changed
+        when the size or modification time of its EEG or eye-tracking file differs from the stored one.
+
+        The stored features are joined with PerformanceScores.csv and correlated with / regressed
+        against the performance score inside groups of the same task, try or subject.
+
+"""
+
+EYE_MOVEMENT_TYPES = {0: "fixation", 1: "saccade", 2: "not_found"}
+
+EEG_FEATURES = ["alpha_power", "theta_power", "alpha_theta_ratio"]
+PUPIL_FEATURES = ["pupil_mean_left", "pupil_mean_right", "pupil_var_left", "pupil_var_right",
+                  "pupil_interpolated_left", "pupil_interpolated_right"]
+RATIO_FEATURES = [f"{name}_ratio" for name in EYE_MOVEMENT_TYPES.values()] + ["fixation_saccade_ratio"]
+TRANSITION_FEATURES = [f"transition_{src}_{dst}" for src in EYE_MOVEMENT_TYPES.values() for dst in EYE_MOVEMENT_TYPES.values()]
+DWELL_FEATURES = [f"dwell_{name}" for name in EYE_MOVEMENT_TYPES.values()] + ["n_transitions"]
+
+FEATURE_NAMES = EEG_FEATURES + PUPIL_FEATURES + RATIO_FEATURES + TRANSITION_FEATURES + DWELL_FEATURES
+SIGNATURE_COLUMNS = ["eeg_size", "eeg_mtime", "eye_size", "eye_mtime"]
+
+GROUP_COLUMNS = {"Task": "Task ID", "Try": "Try", "Subject": "Subject ID"}
+PERFORMANCE_COLUMN = "Performance(out of 100)"
+DEFAULT_REGRESSION_FEATURES = ["alpha_power", "theta_power", "pupil_mean_left", "saccade_ratio", "n_transitions"]
+
+
+class FeatureStore:
+    def __init__(self, data_manager, store_path=None):
+        self.data_manager = data_manager
+        self.store_path = store_path or os.path.join(data_manager.data_dir, 'features.npz')
+        self.features = self.load()
+
+    def load(self):
+        """Reads the stored feature table, or returns an empty one if the file does not exist yet."""
+        columns = ["recording"] + SIGNATURE_COLUMNS + FEATURE_NAMES
+        if not os.path.exists(self.store_path):
+            return pd.DataFrame(columns=columns)
+
+        with np.load(self.store_path, allow_pickle=False) as store:
+            if any(column not in store.files for column in columns):
+                return pd.DataFrame(columns=columns)  # Stored with an older feature set, recompute everything
+            return pd.DataFrame({column: store[column] for column in columns})
+
+    def save(self):
+        columns = {column: self.features[column].to_numpy() for column in SIGNATURE_COLUMNS + FEATURE_NAMES}
+        columns["recording"] = self.features["recording"].to_numpy(dtype=str)  # Fixed-width strings, no pickling
+        np.savez(self.store_path, **columns)
+
+    def file_signature(self, file_path):
+        if not os.path.exists(file_path):
+            return -1, -1
+        stat = os.stat(file_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def recording_signature(self, recording_name):
+        eeg_size, eeg_mtime = self.file_signature(self.data_manager.get_eeg_file_path(recording_name))
+        eye_size, eye_mtime = self.file_signature(self.data_manager.get_eye_file_path(recording_name))
+        return {"eeg_size": eeg_size, "eeg_mtime": eeg_mtime, "eye_size": eye_size, "eye_mtime": eye_mtime}
+
+    def recording_key(self, recording_name, signature=None):
+        """Name plus file sizes / modification times; used as cache key so changed files are never served stale."""
+        signature = signature or self.recording_signature(recording_name)
+        return (recording_name,) + tuple(signature[column] for column in SIGNATURE_COLUMNS)
+
+    def update(self):
+        """Recomputes features for new or changed recordings and drops recordings whose files are gone."""
+        recording_names = self.data_manager.get_recording_names()
+        stored = self.features.set_index("recording") if len(self.features) else None
+
+        columns = ["recording"] + SIGNATURE_COLUMNS + FEATURE_NAMES
+        frames = []
+        recomputed = 0
+        for recording_name in recording_names:
+            signature = self.recording_signature(recording_name)
+            if stored is not None and recording_name in stored.index:
+                stored_signature = stored.loc[recording_name, SIGNATURE_COLUMNS]
+                if all(stored_signature[column] == signature[column] for column in SIGNATURE_COLUMNS):
+                    # A one-row frame keeps the int64 signature columns; a row Series would turn them into float64
+                    frames.append(stored.loc[[recording_name]].reset_index())
+                    continue
+
+            print(f"Computing features for {recording_name}")
+            row = {"recording": recording_name} | signature | self.compute_features(recording_name, signature)
+            frames.append(pd.DataFrame([row], columns=columns))
+            recomputed += 1
+
+        reused = len(frames) - recomputed
+        removed = len(self.features) - reused
+        self.features = pd.concat(frames, ignore_index=True)[columns] if frames else pd.DataFrame(columns=columns)
+        self.features[SIGNATURE_COLUMNS] = self.features[SIGNATURE_COLUMNS].astype(np.int64)
+        self.features[FEATURE_NAMES] = self.features[FEATURE_NAMES].astype(np.float64)
+
+        if recomputed or removed:
+            self.save()
+        print(f"Feature store updated: {recomputed} recomputed, {reused} reused")
+        return recomputed
+
+    def compute_features(self, recording_name, signature):
+        features = dict.fromkeys(FEATURE_NAMES, np.nan)
+        eeg_duration = None
+
+        if signature["eeg_size"] >= 0:
+            eeg = self.data_manager.load_eeg_data(recording_name)
+            try:
+                features.update(self.compute_eeg_features(eeg.data, eeg.info['sfreq']))
+                eeg_duration = eeg.n_times / eeg.info['sfreq']
+            finally:
+                eeg.close()
+
+        if signature["eye_size"] >= 0:
+            eye_data = self.data_manager.load_eye_data(recording_name, pd)
+            # Same rate as the TimeCursor of the views: both recordings span the EEG duration
+            eye_sfreq = len(eye_data) / eeg_duration if eeg_duration else None
+            pupil = self.data_manager.pupil_cleaner.get_cleaned(self.recording_key(recording_name, signature),
+                                                                eye_data, eye_sfreq)
+            features.update(self.compute_eye_features(eye_data, pupil))
+
+        return features
+
+    def band_power(self, freqs, psd, low, high):
+        band = (freqs >= low) & (freqs <= high)
+        return np.trapezoid(psd[band], freqs[band])
+
+    def compute_eeg_features(self, data, sfreq):
+        """Alpha (8-12 Hz) and theta (4-8 Hz) power of the channel-averaged Welch spectrum."""
+        nperseg = min(data.shape[1], int(2 * sfreq))
+        freqs, psd = welch(data, fs=sfreq, nperseg=nperseg, axis=1)
+        psd = psd.mean(axis=0)
+
+        alpha_power = self.band_power(freqs, psd, 8, 12)
+        theta_power = self.band_power(freqs, psd, 4, 8)
+        alpha_theta_ratio = alpha_power / theta_power if theta_power > 0 else np.nan
+
+        return {"alpha_power": alpha_power, "theta_power": theta_power, "alpha_theta_ratio": alpha_theta_ratio}
+
+    def compute_eye_features(self, eye_data, pupil):
+        """
+            Eye features; pupil is the cleaned pupil result of PupilCleaner for the same recording.
+            The pupil mean and variance of an eye flagged as not reliable (mostly interpolated) are NaN.
+        """
+        features = {}
+        n_types = len(EYE_MOVEMENT_TYPES)
+
+        for side in ("left", "right"):
+            diameter = pupil[side].astype(np.float64)
+            reliable = pupil["quality"][f"Reliable {side}"] and np.isfinite(diameter).any()
+            features[f"pupil_mean_{side}"] = np.nanmean(diameter) if reliable else np.nan
+            features[f"pupil_var_{side}"] = np.nanvar(diameter) if reliable else np.nan
+            features[f"pupil_interpolated_{side}"] = pupil["quality"][f"Interpolated {side} (%)"]
+
+        types = eye_data["Eye movement type index"].to_numpy().astype(np.int64)
+        types = types[(types >= 0) & (types < n_types)]
+        if len(types) == 0:
+            return features
+
+        counts = np.bincount(types, minlength=n_types)
+        for type_index, name in EYE_MOVEMENT_TYPES.items():
+            features[f"{name}_ratio"] = counts[type_index] / len(types)
+        features["fixation_saccade_ratio"] = counts[0] / counts[1] if counts[1] else np.nan
+
+        # Transition matrix: row = current type, column = next type, normalised per row
+        transitions = np.bincount(types[:-1] * n_types + types[1:], minlength=n_types ** 2).reshape(n_types, n_types)
+        row_totals = transitions.sum(axis=1, keepdims=True)
+        probabilities = np.divide(transitions, row_totals, out=np.full(transitions.shape, np.nan), where=row_totals > 0)
+        for src_index, src in EYE_MOVEMENT_TYPES.items():
+            for dst_index, dst in EYE_MOVEMENT_TYPES.items():
+                features[f"transition_{src}_{dst}"] = probabilities[src_index, dst_index]
+
+        # Dwell time: mean length (in samples) of the uninterrupted runs of each type
+        run_starts = np.concatenate(([0], np.flatnonzero(np.diff(types)) + 1))
+        run_lengths = np.diff(np.append(run_starts, len(types)))
+        run_types = types[run_starts]
+        run_counts = np.bincount(run_types, minlength=n_types)
+        run_totals = np.bincount(run_types, weights=run_lengths, minlength=n_types)
+        for type_index, name in EYE_MOVEMENT_TYPES.items():
+            features[f"dwell_{name}"] = run_totals[type_index] / run_counts[type_index] if run_counts[type_index] else np.nan
+        features["n_transitions"] = len(run_starts) - 1
+
+        return features
+
+    def merge_with_performance(self):
+        """One row per performance record that has stored features."""
+        perf_df = self.data_manager.load_performance_data(pd)
+
+        # Recordings are keyed by the EEG file name; rows whose EEG file is not stored fall back to the eye file name
+        eeg_stored = perf_df["EEG File Name"].isin(self.features["recording"])
+        perf_df["recording"] = perf_df["EEG File Name"].where(eeg_stored, perf_df["Eye File Name"])
+
+        return perf_df.merge(self.features, on="recording", how="inner")
+
+    def pairwise_correlation(self, X, y):
+        """
+            Pearson correlation of every column of X with y, computed for all columns at once.
+            Missing values are excluded pairwise, so each column uses only the rows where both values exist.
+        """
+        valid = np.isfinite(X) & np.isfinite(y)[:, None]
+        n = valid.sum(axis=0)
+        X0 = np.where(valid, X, 0.0)
+        Y0 = np.where(valid, y[:, None], 0.0)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_x = X0.sum(axis=0) / n
+            mean_y = Y0.sum(axis=0) / n
+            dx = np.where(valid, X0 - mean_x, 0.0)
+            dy = np.where(valid, Y0 - mean_y, 0.0)
+            r = (dx * dy).sum(axis=0) / np.sqrt((dx ** 2).sum(axis=0) * (dy ** 2).sum(axis=0))
+
+        r[n < 3] = np.nan
+        return r, n
+
+    def correlate(self, group_by="Task"):
+        """Correlation of each feature with the performance score inside every group (task, try or subject)."""
+        group_column = GROUP_COLUMNS[group_by]
+        merged = self.merge_with_performance()
+
+        results = []
+        for group_value, group in merged.groupby(group_column):
+            r, n = self.pairwise_correlation(group[FEATURE_NAMES].to_numpy(dtype=np.float64),
+                                             group[PERFORMANCE_COLUMN].to_numpy(dtype=np.float64))
+            results.append(pd.DataFrame({group_by: group_value, "Feature": FEATURE_NAMES, "N": n, "r": r}))
+
+        if not results:
+            return pd.DataFrame(columns=[group_by, "Feature", "N", "r"])
+        return pd.concat(results, ignore_index=True).dropna(subset=["r"])
+
+    def regress(self, group_by="Task", features=None):
+        """Least-squares fit of the performance score on the given features inside every group."""
+        features = features or DEFAULT_REGRESSION_FEATURES
+        group_column = GROUP_COLUMNS[group_by]
+        merged = self.merge_with_performance()
+
+        results = []
+        for group_value, group in merged.groupby(group_column):
+            X = group[features].to_numpy(dtype=np.float64)
+            y = group[PERFORMANCE_COLUMN].to_numpy(dtype=np.float64)
+            complete = np.isfinite(X).all(axis=1) & np.isfinite(y)
+            X, y = X[complete], y[complete]
+            if len(y) <= len(features) + 1:
+                continue  # Not enough recordings for a meaningful fit
+
+            # Standardised features so the coefficients are comparable with each other
+            std = X.std(axis=0)
+            std[std == 0] = 1.0
+            design = np.column_stack([np.ones(len(y)), (X - X.mean(axis=0)) / std])
+            coefficients, _, _, _ = np.linalg.lstsq(design, y, rcond=None)
+
+            residual = y - design @ coefficients
+            total = ((y - y.mean()) ** 2).sum()
+            r2 = 1 - (residual ** 2).sum() / total if total > 0 else np.nan
+
+            results.append({group_by: group_value, "N": len(y), "R2": r2} | dict(zip(features, coefficients[1:])))
+
+        return pd.DataFrame(results, columns=[group_by, "N", "R2"] + features)
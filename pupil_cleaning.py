@@ -0,0 +1,119 @@
+import numpy as np
+from view_cache import ViewCache
+
+"""
+    Blink and dropout-aware pupil diameter cleaning.
+
+        A pupil sample is invalid when the eye was not found (eye movement type index 2), the diameter
+        is missing, or the diameter is outside the plausible range.
+
+        Invalid samples are grouped into dropout runs with array operations (np.diff on the mask), every run
+        is widened by a margin on both sides (the samples around a blink are unreliable too), and the gaps are
+        filled by linear interpolation from the valid samples, all in one np.interp call per eye.
+        The margin is given in seconds and converted to samples with the recording's eye sampling rate.
+        An optional centered moving average smooths the result.
+
+        Data quality percentages are reported per recording; an eye with more than max_interpolated percent
+        interpolated samples is flagged as not reliable. Cleaned arrays are cached per
+        (recording, parameters, eye sampling rate), so the views and the feature store reuse them instead of recomputing.
+
+"""
+
+EYE_NOT_FOUND = 2
+DEFAULT_EYE_SFREQ = 45.0  # Hz; len(eye data) / EEG duration is 42-47 Hz in this dataset
+
+
+class PupilCleaner:
+    def __init__(self, margin=0.02, min_diameter=1.5, max_diameter=9.0, smoothing_window=5, max_interpolated=40.0,
+                 max_cache_bytes=64 * 1024 ** 2):
+        self.margin = margin                      # Seconds added to both sides of every dropout run
+        self.min_diameter = min_diameter          # mm
+        self.max_diameter = max_diameter          # mm
+        self.smoothing_window = smoothing_window  # Samples; 0 or 1 disables smoothing
+        self.max_interpolated = max_interpolated  # %; above this an eye's cleaned signal is flagged as not reliable
+        self.cache = ViewCache(max_bytes=max_cache_bytes)
+
+    def parameters(self):
+        return self.margin, self.min_diameter, self.max_diameter, self.smoothing_window, self.max_interpolated
+
+    def get_cleaned(self, recording_key, eye_data, eye_sfreq=None):
+        """Cleaned pupil diameters of a recording, computed once per (recording, parameters, eye sampling rate)."""
+        eye_sfreq = eye_sfreq or DEFAULT_EYE_SFREQ
+        return self.cache.get_or_compute((recording_key, "pupil", self.parameters(), eye_sfreq),
+                                         lambda: self.clean(eye_data, eye_sfreq))
+
+    def margin_samples(self, eye_sfreq):
+        return int(round(self.margin * eye_sfreq))
+
+    def dropout_mask(self, invalid, margin):
+        """Invalid samples with every dropout run widened by margin samples on both sides."""
+        n = len(invalid)
+        edges = np.diff(np.concatenate(([0], invalid.astype(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        stops = np.flatnonzero(edges == -1)
+
+        # +1 at each padded run start, -1 at each padded run end; overlapping runs simply merge
+        boundaries = np.zeros(n + 1, dtype=np.int32)
+        np.add.at(boundaries, np.clip(starts - margin, 0, n), 1)
+        np.add.at(boundaries, np.clip(stops + margin, 0, n), -1)
+        return np.cumsum(boundaries[:n]) > 0, len(starts)
+
+    def smooth(self, data):
+        """Centered moving average; the edges average over the samples available."""
+        window = self.smoothing_window
+        if window is None or window <= 1 or len(data) == 0:
+            return data
+        cumulative = np.concatenate(([0.0], np.cumsum(data, dtype=np.float64)))
+        idx = np.arange(len(data))
+        lower = np.clip(idx - window // 2, 0, len(data))
+        upper = np.clip(idx + window - window // 2, 0, len(data))
+        return ((cumulative[upper] - cumulative[lower]) / (upper - lower)).astype(np.float32)
+
+    def clean_diameter(self, diameter, eye_not_found, margin):
+        diameter = np.asarray(diameter, dtype=np.float32)
+        missing = ~np.isfinite(diameter)
+        with np.errstate(invalid="ignore"):
+            implausible = ~missing & ((diameter < self.min_diameter) | (diameter > self.max_diameter))
+
+        gaps, n_runs = self.dropout_mask(eye_not_found | missing | implausible, margin)
+        valid = ~gaps
+
+        if valid.any():
+            idx = np.arange(len(diameter))
+            cleaned = diameter.copy()
+            cleaned[gaps] = np.interp(idx[gaps], idx[valid], diameter[valid])
+            cleaned = self.smooth(cleaned)
+        else:
+            cleaned = np.full(len(diameter), np.nan, dtype=np.float32)
+
+        n = max(len(diameter), 1)
+        interpolated = 100 * gaps.sum() / n
+        quality = {"missing": 100 * missing.sum() / n, "implausible": 100 * implausible.sum() / n,
+                   "interpolated": interpolated, "dropout runs": n_runs,
+                   "reliable": bool(valid.any() and interpolated <= self.max_interpolated)}
+        return cleaned, quality
+
+    def clean(self, eye_data, eye_sfreq=DEFAULT_EYE_SFREQ):
+        """
+            Returns {'left': array, 'right': array, 'quality': dict} for one recording.
+            Quality values are percentages of all samples, except the dropout run counts and the reliable flags.
+        """
+        eye_not_found = eye_data["Eye movement type index"].to_numpy() == EYE_NOT_FOUND
+        n = max(len(eye_not_found), 1)
+        margin = self.margin_samples(eye_sfreq)
+
+        result = {"quality": {"Eye not found (%)": 100 * eye_not_found.sum() / n}}
+        for side in ("left", "right"):
+            cleaned, quality = self.clean_diameter(eye_data[f"Pupil diameter {side}"].to_numpy(), eye_not_found, margin)
+            result[side] = cleaned
+            result["quality"].update({f"{name.capitalize()} {side}" + (" (%)" if isinstance(value, float) else ""): value
+                                      for name, value in quality.items()})
+        return result
+
+    def unreliable_sides(self, quality):
+        """Eyes whose cleaned signal is mostly interpolated (see max_interpolated)."""
+        return [side for side in ("left", "right") if not quality[f"Reliable {side}"]]
+
+    def format_quality_report(self, quality):
+        return "\n".join(f"{key}: {value:.1f}" if isinstance(value, float) else f"{key}: {value}"
+                         for key, value in quality.items())
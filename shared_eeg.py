@@ -0,0 +1,219 @@
+import os
+import atexit
+import weakref
+import threading
+import multiprocessing
+import numpy as np
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+from scipy.signal import butter, filtfilt
+
+"""
+    Shared-memory backing for loaded EEG arrays.
+
+        The channels x samples array lives in a multiprocessing.shared_memory block. Worker processes
+        attach to the block by name and read / write their own channel slice in place, so the signal
+        is never pickled and sent to the workers.
+
+        Blocks created by this process are tracked and released when the recording is switched,
+        when the window is closed, and at interpreter exit as a last resort. Only copies of the block
+        should be handed to long-lived objects (plots, caches); a block with live views cannot be closed.
+
+        The worker pool is small (at most MAX_WORKERS processes, each holding its own numpy / scipy imports)
+        and is shut down after IDLE_SHUTDOWN_SECONDS without work; the next map_channels call starts it again.
+
+    This module must stay free of Qt imports: worker processes import it to run the channel functions.
+
+"""
+
+MAX_WORKERS = 4
+IDLE_SHUTDOWN_SECONDS = 60
+
+_live_blocks = {}
+_pending_close = []  # (SharedMemory, weakref to its array) of detached blocks whose numpy views are still alive
+_executor = None
+_idle_timer = None
+_active_calls = 0
+_executor_lock = threading.Lock()
+
+
+class SharedEEGArray:
+    def __init__(self, shape, dtype, name=None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.owner = name is None
+        nbytes = max(1, int(np.prod(self.shape)) * self.dtype.itemsize)
+
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=nbytes if self.owner else 0)
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+        if self.owner:
+            _live_blocks[self.shm.name] = self
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def spec(self):
+        """Picklable description used by workers to attach: (name, shape, dtype)."""
+        return self.name, self.shape, self.dtype.str
+
+    @classmethod
+    def attach(cls, spec):
+        name, shape, dtype = spec
+        return cls(shape, dtype, name=name)
+
+    @property
+    def nbytes(self):
+        return self.array.nbytes if self.array is not None else 0
+
+    def close(self):
+        """
+            Detaches from the block; the creating process also frees it.
+            Every view of the block keeps self.array alive, so while one is still referenced (e.g. by a plotted line)
+            the mapping is kept and release_pending() closes it later; unmapping it would crash on the next access.
+        """
+        if self.shm is None:
+            return
+        shm, self.shm = self.shm, None
+        array_ref = weakref.ref(self.array)
+        self.array = None
+        if self.owner:
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+            _live_blocks.pop(shm.name, None)
+
+        _pending_close.append((shm, array_ref))
+        release_pending()
+
+
+def release_pending():
+    """Closes the detached blocks whose views have all been released; returns how many are still mapped."""
+    for entry in list(_pending_close):
+        shm, array_ref = entry
+        if array_ref() is not None:
+            continue  # A view is still referenced somewhere
+        try:
+            shm.close()
+        except BufferError:
+            continue
+        _pending_close.remove(entry)
+    return len(_pending_close)
+
+
+def max_workers():
+    return max(1, min(MAX_WORKERS, os.cpu_count() or 1))
+
+
+def get_executor():
+    """Worker pool for one map_channels call; every call must be paired with release_executor()."""
+    global _executor, _active_calls
+    with _executor_lock:
+        _cancel_idle_timer()
+        if _executor is None:
+            # Never fork the running GUI process (live Qt / matplotlib threads); spawned workers only import this module
+            _executor = ProcessPoolExecutor(max_workers=max_workers(), mp_context=multiprocessing.get_context("spawn"))
+        _active_calls += 1
+        return _executor
+
+
+def release_executor():
+    """Shuts the worker pool down unless new work arrives within IDLE_SHUTDOWN_SECONDS."""
+    global _idle_timer, _active_calls
+    with _executor_lock:
+        _active_calls -= 1
+        if _active_calls == 0 and _executor is not None:
+            _cancel_idle_timer()
+            _idle_timer = threading.Timer(IDLE_SHUTDOWN_SECONDS, _shutdown_if_idle)
+            _idle_timer.daemon = True
+            _idle_timer.start()
+
+
+def _cancel_idle_timer():
+    global _idle_timer
+    if _idle_timer is not None:
+        _idle_timer.cancel()
+        _idle_timer = None
+
+
+def _shutdown_if_idle():
+    global _executor, _idle_timer
+    with _executor_lock:
+        if _active_calls:
+            return  # A map_channels call started after the idle timer fired
+        _idle_timer = None
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        _cancel_idle_timer()
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+@atexit.register
+def release_all():
+    shutdown_executor()
+    for block in list(_live_blocks.values()):
+        block.close()
+    if release_pending():
+        print(f"{len(_pending_close)} shared EEG block(s) still referenced at exit")
+
+
+def _channel_worker(func, source_spec, output_spec, start, stop, args):
+    source = SharedEEGArray.attach(source_spec)
+    output = SharedEEGArray.attach(output_spec)
+    try:
+        output.array[start:stop] = func(source.array[start:stop], *args)
+    finally:
+        source.close()
+        output.close()
+
+
+def map_channels(func, source, n_output_samples, args=(), dtype=np.float32, n_workers=None):
+    """
+        Applies func(channel_rows, *args) to contiguous channel slices of a shared EEG array in parallel.
+        func must be a module-level function returning an array of shape (len(channel_rows), n_output_samples).
+        Returns a new SharedEEGArray holding the result; the caller is responsible for closing it.
+    """
+    n_channels = source.shape[0]
+    output = SharedEEGArray((n_channels, n_output_samples), dtype)
+
+    n_workers = min(n_workers or max_workers(), n_channels)
+    bounds = np.linspace(0, n_channels, n_workers + 1).astype(int)
+    executor = get_executor()
+    futures = [executor.submit(_channel_worker, func, source.spec, output.spec, start, stop, args)
+               for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+    try:
+        for future in futures:
+            future.result()
+    except Exception:
+        output.close()
+        raise
+    finally:
+        release_executor()
+
+    return output
+
+
+def interpolate_and_bandpass(rows, fs, time_spec, lowcut, highcut, order):
+    """Resamples channel rows onto np.linspace(*time_spec) and applies a Butterworth bandpass filter."""
+    eeg_times = np.arange(rows.shape[1], dtype=np.float64) / fs
+    common_time = np.linspace(*time_spec)
+
+    nyquist = 0.5 * fs
+    b, a = butter(order, [lowcut / nyquist, highcut / nyquist], btype='band')
+
+    filtered = np.empty((rows.shape[0], len(common_time)), dtype=np.float32)
+    for channel_idx in range(rows.shape[0]):
+        filtered[channel_idx] = filtfilt(b, a, np.interp(common_time, eeg_times, rows[channel_idx]))
+    return filtered
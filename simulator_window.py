@@ -5,8 +5,14 @@ from PyQt5.QtWidgets import (QMainWindow, QComboBox, QVBoxLayout, QHBoxLayout, Q
                              QTabWidget, QTableWidget, QTableWidgetItem, QSlider, QScrollArea, QPushButton)
 from PyQt5.QtGui import QPixmap
 from PyQt5.QtCore import Qt
-from Visualization import HeatEyeTrackingPlotWidget, SankeyDiagramWidget, EyeTrackingPlot3DWindow, EEGPupilAnalyzer, EEGSignalVisualizationbWidget
+from Visualization import (HeatEyeTrackingPlotWidget, SankeyDiagramWidget, EyeTrackingPlot3DWindow, EEGPupilAnalyzer,
+                           EEGSignalVisualizationbWidget, EyeEventEEGWidget)
 from data_manager import DataManager
+from shared_eeg import shutdown_executor
+from time_cursor import TimeCursor
+from epoching import EpochEngine, EVENT_TYPES
+from view_cache import ViewCache
+from feature_store import FeatureStore, GROUP_COLUMNS
 
 
 """
@@ -19,6 +25,14 @@ from data_manager import DataManager
             (e.g., EEG signal, eye tracking plot, 3D plot, Sankey diagram).
             
         It also displays performance data in a separate table related to the selected file.
+        
+        The main time slider drives a shared time cursor: the EEG trace and the eye views (heatmap, Sankey, 3D)
+        all show the same 10-second window.
+        
+        Computed view data is kept in a size-bounded LRU view cache keyed by (recording, view, parameters),
+        and a view that already shows the requested key is only made visible again, not redrawn.
+        
+        A feature store tab correlates per-recording EEG/eye features with the performance scores across all recordings.
 
 """
 
@@ -118,7 +132,7 @@ class SimulatorWindow(QMainWindow):
         self.slider_2 = QSlider(Qt.Horizontal)
         self.slider_2.setFixedWidth(100)
         self.slider_2.setMinimum(0)
-        self.slider_2.setMaximum(2)
+        self.slider_2.setMaximum(3)
         self.slider_2.setValue(0)
         left_layout.addWidget(self.slider_2)
         
@@ -127,6 +141,18 @@ class SimulatorWindow(QMainWindow):
         self.performance_table.setVisible(False)
         left_layout.addWidget(self.performance_table)
         
+        # Memory used by the loaded recording
+        self.memory_label = QLabel("")
+        self.memory_label.setVisible(False)
+        self.memory_label.setStyleSheet("font-size: 14px;")
+        left_layout.addWidget(self.memory_label)
+        
+        # Pupil data quality of the loaded recording
+        self.quality_label = QLabel("")
+        self.quality_label.setVisible(False)
+        self.quality_label.setStyleSheet("font-size: 14px;")
+        left_layout.addWidget(self.quality_label)
+        
         # Add visualization widgets to the scroll layout
         self.eeg_vis_widget = EEGSignalVisualizationbWidget()
         self.scroll_layout.addWidget(self.eeg_vis_widget)
@@ -140,6 +166,11 @@ class SimulatorWindow(QMainWindow):
         self.shankey = SankeyDiagramWidget()
         self.scroll_layout.addWidget(self.shankey)
         
+        self.eye_event_eeg_widget = EyeEventEEGWidget()
+        self.scroll_layout.addWidget(self.eye_event_eeg_widget)
+        self.epoch_engine = EpochEngine()
+        self.view_cache = ViewCache()
+        
         self.eye_tracking_3d_window = EyeTrackingPlot3DWindow()
         
         self.scroll_area.setWidgetResizable(True)
@@ -158,13 +189,50 @@ class SimulatorWindow(QMainWindow):
         file_layout.addLayout(right_layout)
 
         self.tabs.addTab(self.file_tab, "Choose File")
+        
+        # --- Feature Store Tab ---
+        self.feature_store = FeatureStore(self.data_manager)
+        
+        self.feature_tab = QWidget()
+        feature_layout = QVBoxLayout(self.feature_tab)
+        feature_controls = QHBoxLayout()
+        feature_controls.setAlignment(Qt.AlignLeft)
+        
+        feature_controls.addWidget(QLabel("Group by:"))
+        self.feature_group_box = QComboBox()
+        self.feature_group_box.addItems(list(GROUP_COLUMNS))
+        self.feature_group_box.currentIndexChanged.connect(self.show_feature_results)
+        feature_controls.addWidget(self.feature_group_box)
+        
+        feature_controls.addWidget(QLabel("Analysis:"))
+        self.feature_analysis_box = QComboBox()
+        self.feature_analysis_box.addItems(["Correlation", "Regression"])
+        self.feature_analysis_box.currentIndexChanged.connect(self.show_feature_results)
+        feature_controls.addWidget(self.feature_analysis_box)
+        
+        self.feature_update_button = QPushButton("Update features")
+        self.feature_update_button.clicked.connect(self.on_feature_update_click)
+        feature_controls.addWidget(self.feature_update_button)
+        feature_layout.addLayout(feature_controls)
+        
+        self.feature_table = QTableWidget()
+        feature_layout.addWidget(self.feature_table)
+        
+        self.tabs.addTab(self.feature_tab, "Feature Store")
+        self.show_feature_results()
  
         self.setLayout(left_layout)
 
-        self.update_combobox()
-
         self.raw = None
         self.eye_data = None
+        self.time_cursor = None
+        self.recording_key = None
+
+        self.update_combobox()
+
+        self.slider.valueChanged.connect(self.on_time_slider_changed)
+        self.slider_2.valueChanged.connect(self.choose_visualization_by_slider)
+        self.channel_box.currentIndexChanged.connect(self.visualize_data)
         
     def update_combobox(self):
         self.data_manager.fill_choose_file_combobox_with_filenames(self.combo_box)
@@ -175,7 +243,7 @@ class SimulatorWindow(QMainWindow):
         if not selected_filename:
             self.eeg_vis_widget.clear_figure()
             self.eeg_and_pupil_analyzer_widget.clear_figure()
-            self.raw = None
+            self.release_eeg_data()
             self.eye_data = None
             
             self.slider.setVisible(False)
@@ -183,11 +251,16 @@ class SimulatorWindow(QMainWindow):
             self.shankey.setVisible(False)
             self.eeg_and_pupil_analyzer_widget.setVisible(False)
             self.heat_eye_tracking_widget.setVisible(False)
+            self.eye_event_eeg_widget.setVisible(False)
             self.channel_label.setVisible(False)
             self.slider_label_2.setVisible(False)
             self.channel_box.setVisible(False)
             self.button_3d.setVisible(False)
+            self.eye_tracking_3d_window.clear_figure()
+            self.eye_tracking_3d_window.hide()
             self.performance_table.setVisible(False)
+            self.memory_label.setVisible(False)
+            self.quality_label.setVisible(False)
             
             print("EEG and Eye data cleared from memory.")
             return
@@ -202,8 +275,13 @@ class SimulatorWindow(QMainWindow):
             self.channel_box.setVisible(True)
             self.eeg_vis_widget.setVisible(True)
             
+            self.release_eeg_data()
             self.raw = self.data_manager.load_eeg_data(selected_filename)
             
+            # Name plus file sizes / modification times: a changed file never hits stale cached views
+            self.recording_key = self.feature_store.recording_key(selected_filename)
+            self.view_cache.invalidate(lambda key: key[0][0] == selected_filename and key[0] != self.recording_key)
+            
             self.channel_box.clear()
             self.channel_box.addItems(self.raw.ch_names)
 
@@ -212,56 +290,150 @@ class SimulatorWindow(QMainWindow):
             self.slider.setMaximum(total_duration - 1)
             
             self.eye_data = self.data_manager.load_eye_data(selected_filename, pd)
-
-            self.slider.valueChanged.connect(self.visualize_data)
-            self.slider_2.valueChanged.connect(self.choose_visualization_by_slider)
-            self.channel_box.currentIndexChanged.connect(self.visualize_data)
+            self.time_cursor = TimeCursor(self.raw.info['sfreq'], self.raw.n_times, len(self.eye_data))
+            
+            self.update_memory_label()
+            print(f"{selected_filename} {self.memory_label.text()}")
+            self.memory_label.setVisible(True)
+            
+            pupil_cleaner = self.data_manager.pupil_cleaner
+            pupil_quality = pupil_cleaner.get_cleaned(self.recording_key, self.eye_data, self.time_cursor.eye_sfreq)["quality"]
+            print(f"Pupil data quality for {selected_filename}: {pupil_quality}")
+            quality_text = "Pupil data quality:\n" + pupil_cleaner.format_quality_report(pupil_quality)
+            for side in pupil_cleaner.unreliable_sides(pupil_quality):
+                quality_text += f"\n⚠️ {side.capitalize()} pupil mostly interpolated, statistics not reliable!"
+            self.quality_label.setText(quality_text)
+            self.quality_label.setVisible(True)
 
             self.display_selected_data()
             self.choose_visualization_by_slider()
             self.visualize_data()
+            self.update_memory_label()  # The views just filled the caches
+            
+            if self.eye_tracking_3d_window.isVisible():
+                self.on_button_3d_click()  # The open 3D window would still show the previous recording
         
+    def update_memory_label(self):
+        """Memory of the loaded recording plus the caches of data derived from it and earlier recordings."""
+        caches = {"View cache": self.view_cache.total_bytes,
+                  "Pupil cache": self.data_manager.pupil_cleaner.cache.total_bytes,
+                  "Epoch cache": self.epoch_engine.nbytes}
+        memory_report = self.data_manager.memory_report(self.raw, self.eye_data, caches)
+        self.memory_label.setText("Memory usage:\n" + self.data_manager.format_memory_report(memory_report))
+
+    def release_eeg_data(self):
+        """Frees the shared memory block of the current recording before it is replaced or the app exits."""
+        self.time_cursor = None
+        self.recording_key = None
+        self.epoch_engine.clear()
+        if self.raw is not None:
+            self.raw.close()
+            self.raw = None
+
+    def closeEvent(self, event):
+        self.release_eeg_data()
+        shutdown_executor()
+        super().closeEvent(event)
+
+    def on_time_slider_changed(self):
+        self.visualize_data()
+        self.update_eye_views()
+
     def visualize_data(self):
-        if self.raw:
+        if self.raw and self.time_cursor is not None:
             selected_time = self.slider.value()
             selected_channel = self.channel_box.currentText()
             if selected_channel:
                 sfreq = self.raw.info['sfreq']
-                time = np.arange(self.raw.n_times) / sfreq
-                data, _ = self.raw[:, :]
 
                 channel_idx = self.raw.ch_names.index(selected_channel)
-                start_idx = int(selected_time * sfreq)
-                end_idx = int(start_idx + 10 * sfreq)  # 10-second window
+                start_idx, end_idx = self.time_cursor.eeg_window(selected_time)  # 10-second window
+                time = np.arange(start_idx, end_idx) / sfreq
 
-                self.eeg_vis_widget.plot_eeg_signal(data[channel_idx, start_idx:end_idx],
-                                                    time[start_idx:end_idx],
+                # A copy: the plotted line must not keep a view of the shared block alive after release_eeg_data
+                self.eeg_vis_widget.plot_eeg_signal(self.raw.data[channel_idx, start_idx:end_idx].copy(),
+                                                    time,
                                                     selected_channel)
                 
+    def update_eye_views(self):
+        """Moves the visible eye views to the eye samples of the current EEG window."""
+        if self.time_cursor is None:
+            return
+        eye_window = self.time_cursor.eye_window(self.slider.value())
+
+        if self.heat_eye_tracking_widget.isVisible():
+            self.heat_eye_tracking_widget.set_time_window(eye_window)
+        if self.shankey.isVisible():
+            self.shankey.set_time_window(eye_window)
+        if self.eye_tracking_3d_window.isVisible():
+            self.eye_tracking_3d_window.set_time_window(eye_window)
+
+    def show_cached_view(self, widget, view_name, parameters, compute, render):
+        """
+            Shows a view, redrawing it only if it does not already display this (recording, view, parameters) key.
+            The computed plot data comes from the view cache when available.
+            Returns True if the view was redrawn.
+        """
+        key = (self.recording_key, view_name, parameters)
+        widget.setVisible(True)
+        if widget.rendered_key == key:
+            return False
+
+        render(self.view_cache.get_or_compute(key, compute))
+        widget.rendered_key = key
+        return True
+
     def choose_visualization_by_slider(self):
+        if self.raw is None or self.eye_data is None:
+            return
         slider_value = self.slider_2.value()
+        eye_window = self.time_cursor.eye_window(self.slider.value())
+
+        # The slider can jump several positions (page step, Home/End, dragging), so hide every view that is not selected
+        views = (self.eeg_and_pupil_analyzer_widget, self.heat_eye_tracking_widget, self.shankey, self.eye_event_eeg_widget)
+        selected = views[slider_value] if 0 <= slider_value < len(views) else None
+        for widget in views:
+            widget.setVisible(widget is selected)
+
         if slider_value == 0:
             print(self.slider_2.value())
             self.slider_label_2.setText("Eye Tracking Plot:")
-            self.heat_eye_tracking_widget.setVisible(False)
-            self.eeg_and_pupil_analyzer_widget.setVisible(True)  # Show eye tracking plot
-            self.eeg_and_pupil_analyzer_widget.show_pupil_eeg_plot(pd, np, self.raw, self.eye_data)  # Update plot
+            analyzer = self.eeg_and_pupil_analyzer_widget  # Show eye tracking plot
+            pupil_cleaner = self.data_manager.pupil_cleaner
+            self.show_cached_view(analyzer, "pupil_eeg", analyzer.plot_parameters() + pupil_cleaner.parameters(),
+                                  lambda: analyzer.compute_plot_data(self.raw, self.eye_data,
+                                                                     pupil_cleaner.get_cleaned(self.recording_key, self.eye_data,
+                                                                                               self.time_cursor.eye_sfreq)),
+                                  lambda data: analyzer.create_pupil_eeg_plot(**data))
         
         elif slider_value == 1:
             print(self.slider_2.value())
             self.slider_label_2.setText("Heat Eye Tracking Plot:")
-            self.shankey.setVisible(False)
-            self.eeg_and_pupil_analyzer_widget.setVisible(False)
-            self.heat_eye_tracking_widget.setVisible(True)
-            self.heat_eye_tracking_widget.plot_heat_eye_tracking_data(self.eye_data)
+            heat = self.heat_eye_tracking_widget
+            if not self.show_cached_view(heat, "heat", (), lambda: heat.compute_plot_data(self.eye_data),
+                                         lambda data: heat.render_plot_data(data, eye_window)):
+                heat.set_time_window(eye_window)  # The slider may have moved while the view was hidden
         elif slider_value == 2:
             self.slider_label_2.setText("Sankey Diagram:")
-            self.heat_eye_tracking_widget.setVisible(False)
-            self.shankey.setVisible(True)
-            self.shankey.show_sankey_diagram(self.eye_data)
+            if not self.show_cached_view(self.shankey, "sankey", (), lambda: self.shankey.compute_plot_data(self.eye_data),
+                                         lambda data: self.shankey.render_plot_data(data, eye_window)):
+                self.shankey.set_time_window(eye_window)
+        elif slider_value == 3:
+            self.slider_label_2.setText("Eye Event EEG Averages:")
+            engine = self.epoch_engine
+            self.show_cached_view(self.eye_event_eeg_widget, "eye_event_eeg", (engine.tmin, engine.tmax, engine.baseline),
+                                  self.compute_eye_event_averages, self.eye_event_eeg_widget.plot_event_averages)
+        self.update_memory_label()
+
+    def compute_eye_event_averages(self):
+        """EEG epochs averaged around saccade onsets and fixation starts of the current recording."""
+        eye_types = self.eye_data["Eye movement type index"].to_numpy()
+
+        return {event_name: self.epoch_engine.get_average(self.recording_key, self.raw, eye_types, self.time_cursor, event_type)
+                for event_name, event_type in EVENT_TYPES.items()}
 
     def on_button_3d_click(self):
-        self.eye_tracking_3d_window.plot_eye_tracking_data_3d(self.eye_data)
+        self.eye_tracking_3d_window.plot_eye_tracking_data_3d(self.eye_data, self.time_cursor.eye_window(self.slider.value()))
         self.eye_tracking_3d_window.show()
         
     def display_selected_data(self):
@@ -272,4 +444,25 @@ class SimulatorWindow(QMainWindow):
             return
 
         self.data_manager.insert_performance_data_into_table(pd, selected_file, QtWidgets, QTableWidgetItem, self.performance_table)
-                
\ No newline at end of file
+
+    def on_feature_update_click(self):
+        self.feature_store.update()
+        self.show_feature_results()
+
+    def show_feature_results(self):
+        """Fills the feature store table with the selected analysis of the stored features."""
+        if self.feature_store.features.empty:
+            self.feature_table.clear()
+            self.feature_table.setRowCount(1)
+            self.feature_table.setColumnCount(1)
+            self.feature_table.setItem(0, 0, QTableWidgetItem("No features stored yet, press 'Update features'"))
+            return
+
+        group_by = self.feature_group_box.currentText()
+        if self.feature_analysis_box.currentText() == "Correlation":
+            results = self.feature_store.correlate(group_by)
+        else:
+            results = self.feature_store.regress(group_by)
+
+        self.feature_table.setSortingEnabled(False)  # Sorting while inserting would scramble the rows
+        self.data_manager.insert_dataframe_into_table(QTableWidgetItem, QtWidgets, self.feature_table, results)
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from epoching import EpochEngine, event_onsets, extract_epochs  # noqa: E402
+from time_cursor import TimeCursor  # noqa: E402
+
+
+class FakeRecording:
+    def __init__(self, data, sfreq):
+        self.data = data
+        self.info = {'sfreq': sfreq}
+
+
+def test_event_onsets_are_the_switches_to_the_type():
+    assert list(event_onsets([0, 1, 1, 0, 1, 2, 1], 1)) == [1, 4, 6]
+    assert list(event_onsets([1, 1, 0], 1)) == []  # A recording starting inside an event has no onset for it
+
+
+def test_extract_epochs_matches_slicing_and_drops_events_out_of_bounds():
+    data = np.arange(2 * 50, dtype=np.float64).reshape(2, 50)
+
+    epochs = extract_epochs(data, [2, 10, 25, 48], pre_samples=3, post_samples=5)
+
+    assert epochs.shape == (2, 2, 8) and epochs.dtype == np.float32
+    for event_idx, onset in enumerate([10, 25]):
+        np.testing.assert_array_equal(epochs[:, event_idx], data[:, onset - 3:onset + 5])
+
+    assert extract_epochs(data, [0], 3, 5).shape == (2, 0, 8)
+
+
+def test_epoch_engine_baseline_correction_and_average():
+    sfreq = 100.0
+    n_times = 1000
+    data = np.tile(np.arange(n_times, dtype=np.float32), (3, 1))  # A ramp: every epoch differs only by an offset
+    eye_types = np.zeros(n_times, dtype=np.int8)
+    eye_types[[200, 500, 800]] = 1
+    cursor = TimeCursor(sfreq, n_times, n_eye_samples=n_times, eye_sfreq=sfreq)
+
+    engine = EpochEngine(tmin=-0.1, tmax=0.2, baseline=(-0.1, 0.0))
+    result = engine.get_average("rec", FakeRecording(data, sfreq), eye_types, cursor, event_type=1)
+
+    assert result["n_events"] == 3
+    assert "epochs" not in result
+    np.testing.assert_allclose(result["times"], np.arange(-10, 20) / sfreq)
+
+    # Baseline-corrected ramp: the mean of samples -10..0 (inclusive) is -5, independent of the onset
+    expected = np.arange(-10, 20) + 5.0
+    np.testing.assert_allclose(result["average"], np.tile(expected, (3, 1)), atol=1e-3)
+
+    assert engine.get_average("rec", None, None, None, event_type=1) is result  # Served from the cache
+    engine.clear()
+    assert engine.nbytes == 0
@@ -0,0 +1,152 @@
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feature_store import FeatureStore  # noqa: E402
+from pupil_cleaning import PupilCleaner  # noqa: E402
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EYE_COLUMNS = [f"column {idx}" for idx in range(17)] + ["Pupil diameter left", "Pupil diameter right",
+                                                         "Eye movement type index"]
+
+
+class EyeOnlyDataManager:
+    """Serves the eye-tracking files of a directory; there are no EEG files."""
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self.eye_dir = os.path.join(data_dir, 'EYE')
+        self.pupil_cleaner = PupilCleaner()
+
+    def get_eeg_file_path(self, recording_name):
+        return os.path.join(self.data_dir, 'EEG', recording_name + '.edf')
+
+    def get_eye_file_path(self, recording_name):
+        return os.path.join(self.eye_dir, recording_name + '.csv')
+
+    def get_recording_names(self):
+        return sorted(f.removesuffix('.csv') for f in os.listdir(self.eye_dir) if f.endswith('.csv'))
+
+    def load_eye_data(self, recording_name, pd):
+        return pd.read_csv(self.get_eye_file_path(recording_name), header=None, names=EYE_COLUMNS)
+
+
+def make_store(tmp_path):
+    shutil.copytree(os.path.join(REPO_DIR, 'EYE'), tmp_path / 'EYE')
+    return FeatureStore(EyeOnlyDataManager(str(tmp_path)), store_path=str(tmp_path / 'features.npz'))
+
+
+def test_update_without_changes_recomputes_nothing(tmp_path):
+    store = make_store(tmp_path)
+    n_recordings = len(store.data_manager.get_recording_names())
+
+    assert store.update() == n_recordings
+    assert store.update() == 0
+    assert store.features["eye_mtime"].dtype == np.int64
+
+    # A new session reading the saved file must not recompute either
+    assert FeatureStore(store.data_manager, store_path=store.store_path).update() == 0
+
+
+def test_update_recomputes_only_the_changed_recording(tmp_path):
+    store = make_store(tmp_path)
+    store.update()
+
+    changed = store.data_manager.get_recording_names()[0]
+    eye_file = store.data_manager.get_eye_file_path(changed)
+    stat = os.stat(eye_file)
+    os.utime(eye_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_007))
+
+    assert store.update() == 1
+    assert FeatureStore(store.data_manager, store_path=store.store_path).update() == 0
+
+
+def make_eye_data(types):
+    return pd.DataFrame({"Eye movement type index": np.asarray(types, dtype=np.int8)})
+
+
+def make_pupil(n):
+    quality = {"Interpolated left (%)": 0.0, "Reliable left": True,
+               "Interpolated right (%)": 90.0, "Reliable right": False}
+    return {"left": np.full(n, 4.0, dtype=np.float32), "right": np.full(n, 4.0, dtype=np.float32), "quality": quality}
+
+
+def test_compute_eye_features_transitions_and_dwell_times(tmp_path):
+    store = FeatureStore(EyeOnlyDataManager(str(tmp_path)), store_path=str(tmp_path / 'features.npz'))
+    types = [0, 0, 0, 1, 1, 0, 2, 2, 2, 2]
+    features = store.compute_eye_features(make_eye_data(types), make_pupil(len(types)))
+
+    assert features["fixation_ratio"] == 0.4
+    assert features["fixation_saccade_ratio"] == 2.0
+
+    # Transitions out of fixation: 0->0 twice, 0->1 once, 0->2 once
+    assert features["transition_fixation_fixation"] == 0.5
+    assert features["transition_fixation_saccade"] == 0.25
+    assert features["transition_fixation_not_found"] == 0.25
+    assert features["transition_saccade_fixation"] == 0.5
+    assert features["transition_not_found_not_found"] == 1.0
+
+    # Runs: 0 x3, 1 x2, 0 x1, 2 x4
+    assert features["dwell_fixation"] == 2.0
+    assert features["dwell_saccade"] == 2.0
+    assert features["dwell_not_found"] == 4.0
+    assert features["n_transitions"] == 3
+
+    # A pupil flagged as not reliable gets no statistics
+    assert features["pupil_mean_left"] == 4.0
+    assert np.isnan(features["pupil_mean_right"]) and np.isnan(features["pupil_var_right"])
+
+
+def test_pairwise_correlation_matches_corrcoef_with_missing_values(tmp_path):
+    store = FeatureStore(EyeOnlyDataManager(str(tmp_path)), store_path=str(tmp_path / 'features.npz'))
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(30, 4))
+    y = X[:, 0] * 2 + rng.normal(size=30)
+    X[[1, 5, 7], 1] = np.nan
+    y[10] = np.nan
+    X[:28, 3] = np.nan  # Only two complete rows: too few for a correlation
+
+    r, n = store.pairwise_correlation(X, y)
+
+    for column in range(3):
+        valid = np.isfinite(X[:, column]) & np.isfinite(y)
+        assert n[column] == valid.sum()
+        assert np.isclose(r[column], np.corrcoef(X[valid, column], y[valid])[0, 1])
+    assert n[3] == 2 and np.isnan(r[3])
+
+
+class PerformanceDataManager(EyeOnlyDataManager):
+    def __init__(self, data_dir, performance):
+        super().__init__(data_dir)
+        self.performance = performance
+
+    def load_performance_data(self, pd):
+        return self.performance.copy()
+
+
+def test_regress_recovers_a_linear_relation_per_group(tmp_path):
+    rng = np.random.default_rng(1)
+    names = [f"rec_{idx}" for idx in range(10)]
+    x1, x2 = rng.normal(size=10), rng.normal(size=10)
+    score = 50 + 3 * x1 - 2 * x2
+
+    performance = pd.DataFrame({"EEG File Name": names, "Eye File Name": names,
+                                "Task ID": [1] * 7 + [2] * 3, "Try": 1, "Subject ID": 1,
+                                "Performance(out of 100)": score})
+    store = FeatureStore(PerformanceDataManager(str(tmp_path), performance), store_path=str(tmp_path / 'features.npz'))
+    store.features = pd.DataFrame({"recording": names, "alpha_power": x1, "theta_power": x2})
+    store.features.loc[0, "alpha_power"] = np.nan  # Incomplete rows are left out of the fit
+
+    results = store.regress("Task", features=["alpha_power", "theta_power"])
+
+    assert list(results["Task"]) == [1]  # Task 2 has too few recordings for two features
+    row = results.iloc[0]
+    assert row["N"] == 6
+    assert np.isclose(row["R2"], 1.0)
+    assert np.isclose(row["alpha_power"], 3 * x1[1:7].std())  # Coefficients of the standardised features
+    assert np.isclose(row["theta_power"], -2 * x2[1:7].std())
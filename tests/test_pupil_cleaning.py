@@ -0,0 +1,57 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pupil_cleaning import PupilCleaner  # noqa: E402
+
+
+def mask(indices, n=12):
+    invalid = np.zeros(n, dtype=bool)
+    invalid[list(indices)] = True
+    return invalid
+
+
+def test_dropout_mask_pads_runs_and_clips_at_the_edges():
+    gaps, n_runs = PupilCleaner().dropout_mask(mask([0, 6, 7]), margin=1)
+
+    assert n_runs == 2
+    np.testing.assert_array_equal(np.flatnonzero(gaps), [0, 1, 5, 6, 7, 8])
+
+
+def test_dropout_mask_merges_runs_whose_padding_overlaps():
+    gaps, n_runs = PupilCleaner().dropout_mask(mask([3, 7]), margin=2)
+
+    assert n_runs == 2
+    np.testing.assert_array_equal(np.flatnonzero(gaps), np.arange(1, 10))
+
+    gaps, _ = PupilCleaner().dropout_mask(mask([3, 7]), margin=0)
+    np.testing.assert_array_equal(np.flatnonzero(gaps), [3, 7])
+
+
+def test_margin_is_converted_with_the_eye_sampling_rate():
+    cleaner = PupilCleaner(margin=0.05)
+
+    assert cleaner.margin_samples(40.0) == 2
+    assert cleaner.margin_samples(120.0) == 6
+
+
+def test_clean_interpolates_gaps_and_flags_mostly_interpolated_eyes():
+    n = 20
+    left = np.linspace(3.0, 5.0, n)
+    left[[5, 6]] = np.nan
+    right = np.full(n, np.nan)
+    right[:4] = 4.0
+    eye_data = pd.DataFrame({"Pupil diameter left": left, "Pupil diameter right": right,
+                             "Eye movement type index": np.zeros(n, dtype=np.int8)})
+
+    result = PupilCleaner(margin=0.0, smoothing_window=0).clean(eye_data, eye_sfreq=50.0)
+
+    np.testing.assert_allclose(result["left"], np.linspace(3.0, 5.0, n), rtol=1e-6)
+    assert result["quality"]["Interpolated left (%)"] == 10.0
+    assert result["quality"]["Dropout runs left"] == 1
+    assert result["quality"]["Reliable left"]
+    assert not result["quality"]["Reliable right"]
@@ -0,0 +1,42 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shared_eeg  # noqa: E402
+from shared_eeg import SharedEEGArray, interpolate_and_bandpass, map_channels, release_pending  # noqa: E402
+
+
+def test_map_channels_matches_the_serial_result():
+    source = SharedEEGArray((6, 2000), np.float32)
+    source.array[:] = np.random.default_rng(0).normal(size=(6, 2000))
+    args = (250.0, (0.0, 7.9, 500), 8, 12, 4)
+
+    try:
+        output = map_channels(interpolate_and_bandpass, source, 500, args=args, n_workers=2)
+        try:
+            np.testing.assert_allclose(output.array, interpolate_and_bandpass(source.array, *args), atol=1e-6)
+        finally:
+            output.close()
+    finally:
+        source.close()
+        shared_eeg.shutdown_executor()
+
+    assert not shared_eeg._live_blocks
+
+
+def test_close_keeps_the_block_mapped_while_a_view_is_alive():
+    block = SharedEEGArray((4, 10), np.float32)
+    block.array[:] = 1.0
+    view = block.array[2, 3:]
+
+    block.close()
+
+    assert block.shm is None and block.nbytes == 0
+    assert release_pending() == 1
+    assert view.sum() == 7.0  # Still readable, not unmapped under the view
+
+    del view
+    assert release_pending() == 0
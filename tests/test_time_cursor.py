@@ -0,0 +1,45 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from time_cursor import TimeCursor, range_delta  # noqa: E402
+
+
+def test_range_delta_for_overlapping_windows():
+    assert range_delta((0, 10), (5, 15)) == ([(0, 5)], [(10, 15)])
+    assert range_delta((5, 15), (0, 10)) == ([(10, 15)], [(0, 5)])
+    assert range_delta((0, 10), (0, 10)) == ([], [])
+    assert range_delta((0, 20), (5, 10)) == ([(0, 5), (10, 20)], [])
+
+
+def test_range_delta_without_overlap_replaces_the_whole_window():
+    assert range_delta((0, 10), (10, 20)) == ([(0, 10)], [(10, 20)])
+    assert range_delta((30, 40), (0, 5)) == ([(30, 40)], [(0, 5)])
+
+
+def test_range_delta_keeps_incremental_counts_equal_to_recounting():
+    values = np.random.default_rng(0).integers(0, 5, size=200)
+    window = (0, 0)
+    counts = np.zeros(5, dtype=np.int64)
+    for new_window in [(0, 50), (10, 60), (5, 40), (100, 150), (120, 200), (0, 200), (80, 90)]:
+        leaving, entering = range_delta(window, new_window)
+        for start, stop in leaving:
+            counts -= np.bincount(values[start:stop], minlength=5)
+        for start, stop in entering:
+            counts += np.bincount(values[start:stop], minlength=5)
+        window = new_window
+        np.testing.assert_array_equal(counts, np.bincount(values[slice(*window)], minlength=5))
+
+
+def test_eye_window_covers_the_same_seconds_as_the_eeg_window():
+    cursor = TimeCursor(eeg_sfreq=500.0, eeg_n_times=500 * 30, n_eye_samples=50 * 30)
+
+    assert cursor.eye_sfreq == 50.0
+    assert cursor.eeg_window(5) == (2500, 7500)
+    assert cursor.eye_window(5) == (250, 750)
+    assert cursor.eeg_window(25) == (12500, 15000)  # Both windows are cut at the end of the recording
+    assert cursor.eye_window(25) == (1250, 1500)
+    np.testing.assert_array_equal(cursor.eye_to_eeg_samples([0, 250]), [0, 2500])
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from view_cache import ViewCache, data_nbytes  # noqa: E402
+
+
+def block(n_bytes):
+    return {"values": np.zeros(n_bytes, dtype=np.uint8)}
+
+
+def test_data_nbytes_searches_nested_values():
+    assert data_nbytes({"a": np.zeros(4, dtype=np.float32), "b": [np.zeros(2), (np.zeros(1, dtype=np.int8), 3)]}) == 33
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    cache = ViewCache(max_bytes=300)
+    cache.put("a", block(100))
+    cache.put("b", block(100))
+    cache.put("c", block(100))
+    assert cache.get("a") is not None  # "b" is now the least recently used
+
+    cache.put("d", block(100))
+
+    assert list(cache.entries) == ["c", "a", "d"]
+    assert cache.get("b") is None
+    assert cache.total_bytes == 300
+
+
+def test_an_entry_larger_than_the_limit_is_kept_alone():
+    cache = ViewCache(max_bytes=100)
+    cache.put("a", block(50))
+    cache.put("b", block(500))
+
+    assert list(cache.entries) == ["b"]
+    assert cache.total_bytes == 500
+
+
+def test_put_replaces_and_invalidate_drops_matching_keys():
+    cache = ViewCache()
+    cache.put(("rec1", "heat"), block(10))
+    cache.put(("rec1", "heat"), block(20))
+    cache.put(("rec2", "heat"), block(30))
+    assert cache.total_bytes == 50
+
+    cache.invalidate(lambda key: key[0] == "rec1")
+    assert list(cache.entries) == [("rec2", "heat")]
+    assert cache.total_bytes == 30
+
+    calls = []
+    data = cache.get_or_compute(("rec2", "sankey"), lambda: calls.append(1) or block(5))
+    assert cache.get_or_compute(("rec2", "sankey"), lambda: calls.append(1) or block(5)) is data
+    assert calls == [1]
+
+    cache.invalidate()
+    assert cache.total_bytes == 0 and not cache.entries
@@ -0,0 +1,74 @@
+import numpy as np
+
+"""
+    Shared time cursor between the EEG and the eye-tracking recording.
+
+        The main slider selects a start second; the cursor turns it into an EEG sample range and an
+        eye-tracking sample range covering the same time window.
+
+        The eye sample index belonging to every whole second is precomputed once per recording:
+            - from eye timestamps (seconds since the EEG start) with np.searchsorted, when timestamps are available
+            - otherwise from the eye sampling rate; without a known rate both recordings are assumed to
+              start together and last equally long, so the rate is len(eye data) / EEG duration
+
+    Incremental helpers:
+
+        eye_to_eeg_samples() maps eye sample indices (e.g. eye movement event onsets) to EEG sample indices.
+        range_delta() returns the index ranges that leave and enter when a window moves, so views can
+        subtract / add only those samples instead of recounting the whole window.
+
+"""
+
+
+class TimeCursor:
+    def __init__(self, eeg_sfreq, eeg_n_times, n_eye_samples, eye_sfreq=None, eye_times=None, window_seconds=10):
+        self.eeg_sfreq = eeg_sfreq
+        self.eeg_n_times = eeg_n_times
+        self.n_eye_samples = n_eye_samples
+        self.window_seconds = window_seconds
+
+        duration = eeg_n_times / eeg_sfreq
+        seconds = np.arange(int(np.ceil(duration)) + window_seconds + 1, dtype=np.float64)
+
+        self.eye_times = eye_times
+
+        if eye_times is not None:
+            self.eye_index_by_second = np.searchsorted(eye_times, seconds, side="left")
+            self.eye_sfreq = n_eye_samples / (eye_times[-1] - eye_times[0]) if n_eye_samples > 1 else np.nan
+        else:
+            self.eye_sfreq = eye_sfreq or (n_eye_samples / duration if duration > 0 else 1.0)
+            self.eye_index_by_second = np.minimum(np.ceil(seconds * self.eye_sfreq).astype(np.int64), n_eye_samples)
+
+    def eeg_window(self, start_second):
+        start_idx = min(int(start_second * self.eeg_sfreq), self.eeg_n_times)
+        end_idx = min(int(start_idx + self.window_seconds * self.eeg_sfreq), self.eeg_n_times)
+        return start_idx, end_idx
+
+    def eye_window(self, start_second):
+        start_second = int(np.clip(start_second, 0, len(self.eye_index_by_second) - 1 - self.window_seconds))
+        return int(self.eye_index_by_second[start_second]), int(self.eye_index_by_second[start_second + self.window_seconds])
+
+    def eye_to_eeg_samples(self, eye_indices):
+        """EEG sample index at the time of each given eye sample index."""
+        eye_indices = np.asarray(eye_indices)
+        if self.eye_times is not None:
+            seconds = self.eye_times[eye_indices]
+        else:
+            seconds = eye_indices / self.eye_sfreq
+        return np.round(seconds * self.eeg_sfreq).astype(np.int64)
+
+
+def range_delta(old_window, new_window):
+    """
+        Index ranges (start, stop) that leave and enter when a window moves from old_window to new_window.
+        Returns (leaving, entering); each is a list of at most two ranges.
+    """
+    old_start, old_stop = old_window
+    new_start, new_stop = new_window
+
+    if old_stop <= new_start or new_stop <= old_start:  # No overlap
+        return [(old_start, old_stop)], [(new_start, new_stop)]
+
+    leaving = [r for r in ((old_start, new_start), (new_stop, old_stop)) if r[1] > r[0]]
+    entering = [r for r in ((new_start, old_start), (old_stop, new_stop)) if r[1] > r[0]]
+    return leaving, entering
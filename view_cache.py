@@ -0,0 +1,63 @@
+from collections import OrderedDict
+import numpy as np
+
+"""
+    Size-bounded LRU cache for computed view data.
+
+        Keys are (recording, view, parameters) tuples, values are dicts of plot-ready arrays
+        (e.g. the filtered and interpolated pupil / EEG signals, the encoded eye movement transitions).
+        The least recently used entries are dropped once the total array size exceeds max_bytes.
+
+        The recording part of the key should identify the file contents as well as the name
+        (see SimulatorWindow.recording_key), so a changed file or changed parameters never hit a stale entry.
+
+"""
+
+
+def data_nbytes(data):
+    """Bytes held by the arrays of a cached value (dicts and lists are searched recursively)."""
+    if isinstance(data, np.ndarray):
+        return data.nbytes
+    if isinstance(data, dict):
+        return sum(data_nbytes(value) for value in data.values())
+    if isinstance(data, (list, tuple)):
+        return sum(data_nbytes(value) for value in data)
+    return 0
+
+
+class ViewCache:
+    def __init__(self, max_bytes=256 * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (data, nbytes)
+        self.total_bytes = 0
+
+    def get(self, key):
+        if key not in self.entries:
+            return None
+        self.entries.move_to_end(key)
+        return self.entries[key][0]
+
+    def put(self, key, data):
+        self.invalidate(lambda entry_key: entry_key == key)
+
+        nbytes = data_nbytes(data)
+        self.entries[key] = (data, nbytes)
+        self.total_bytes += nbytes
+
+        # Evict least recently used entries, but always keep the newest one
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            _, (_, evicted_bytes) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_bytes
+
+    def get_or_compute(self, key, compute):
+        data = self.get(key)
+        if data is None:
+            data = compute()
+            self.put(key, data)
+        return data
+
+    def invalidate(self, predicate=None):
+        """Drops every entry whose key matches predicate(key), or all entries without a predicate."""
+        for key in [key for key in self.entries if predicate is None or predicate(key)]:
+            _, nbytes = self.entries.pop(key)
+            self.total_bytes -= nbytes